@@ -1,4 +1,20 @@
-from .tools.media_downloader import download
-from .tools.media_converter import convert
-from .utils.command_manager import command_manager
 from .utils.media_format import all_formats, audio_formats, image_formats, video_formats
+
+# Submodules resolved on first access so importing the package stays cheap
+_LAZY_ATTRIBUTES = {
+    "download": (".tools.media_downloader", "download"),
+    "convert": (".tools.media_converter", "convert"),
+    "command_manager": (".utils.command_manager", "command_manager"),
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = getattr(import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
@@ -1,25 +1,79 @@
 import asyncio
-import ffmpeg
+import itertools
 import os
-import textwrap
+import shutil
+import subprocess
 import sys
+import time
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from glob import glob
-from datetime import datetime
+from glob import iglob
 from typing import Optional, List, Dict, Any
-from functools import partial, reduce
-from ..utils.media_format import all_formats
-from ..utils.config import get_max_workers_default
+from functools import lru_cache, partial
+from ..utils.media_format import (
+    all_formats,
+    audio_formats,
+    image_formats,
+    hw_codec_families,
+    hw_encoder_backends,
+    preset_formats,
+    format_output_options,
+)
+from ..utils.console import write_status_lines
+from ..utils.config import (
+    get_conversion_max_workers_default,
+    get_hwaccel_default,
+    get_video_preset_default,
+    get_files_per_process_default,
+    get_max_retries_default,
+)
+
+# Alias -> ffmpeg format index, built once instead of scanning all_formats per file
+_FORMAT_BY_ALIAS: Dict[str, str] = {fmt["alias"]: fmt["format"] for fmt in all_formats}
+
+# Stream kept for targets that can share one ffmpeg process across several files
+_MULTI_OUTPUT_STREAMS: Dict[str, str] = {
+    **{fmt["alias"]: "v:0" for fmt in image_formats},
+    **{fmt["alias"]: "a:0" for fmt in audio_formats},
+}
+
+# Output options that only apply when re-encoding, dropped for stream copies
+_ENCODER_OPTIONS = frozenset({"vcodec", "acodec", "preset", "crf"})
+
+# Source extension and target pairs whose usual codecs fit the target container as is,
+# e.g. YouTube's AAC m4a and Opus/VP9 webm downloads
+_REMUX_PAIRS = frozenset({
+    ("m4a", "aac"), ("m4a", "mp4"), ("webm", "mkv"), ("webm", "opus"),
+    ("mp4", "mov"), ("mov", "mp4"),
+})
+
+# Seconds before the first retry of a failed ffmpeg spawn, doubled per attempt
+RETRY_DELAY = 0.5
+
+# ffmpeg executable, resolved once instead of on every spawned conversion
+_FFMPEG_BINARY = shutil.which("ffmpeg") or "ffmpeg"
+
+# Run timestamp plus process-local sequence keep output names unique,
+# without a clock read for every file in a batch
+_RUN_TIMESTAMP = time.time_ns()
+_OUTPUT_COUNTER = itertools.count()
+
+# Encoder names reported by `ffmpeg -encoders`, filled on first hardware lookup
+_available_encoders: Optional[frozenset] = None
+
+# Seconds allowed for the one frame test encode that checks a hardware encoder
+ENCODER_PROBE_TIMEOUT = 10
 
 
 def resolve_file_paths(input_pattern: str) -> List[Path]:
     """Resolve input file pattern to actual file paths, supporting glob patterns."""
     if "*" in input_pattern:
-        files = [Path(p) for p in glob(input_pattern)]
-        if not files:
-            files = [Path(p) for p in glob(f"**/{input_pattern}", recursive=True)]
+        files = list(map(Path, iglob(input_pattern)))
+        if not files and not os.path.isabs(input_pattern):
+            # Recursive fallback, rglob walks the tree with os.scandir
+            files = list(Path(".").rglob(input_pattern))
     else:
-        files = [Path(input_pattern)] if Path(input_pattern).exists() else []
+        files = [Path(input_pattern)] if os.path.exists(input_pattern) else []
 
     if not files:
         raise FileNotFoundError(f"No file(s) found matching: {input_pattern}")
@@ -27,17 +81,21 @@ def resolve_file_paths(input_pattern: str) -> List[Path]:
     return files
 
 
+def get_output_directory(output_dir: Optional[str]) -> Path:
+    """Get output directory Path, the default convert folder when none is given."""
+    return Path(output_dir) if output_dir else Path(os.getcwd()) / "convert"
+
+
 def ensure_output_directory(output_dir: Optional[str]) -> Path:
     """Create output directory if needed and return Path object."""
-    path = Path(output_dir) if output_dir else Path(os.getcwd()) / "convert"
+    path = get_output_directory(output_dir)
     path.mkdir(parents=True, exist_ok=True)
     return path
 
 
 def generate_output_filename(input_file: Path, output_format: str) -> str:
-    """Generate unique output filename with timestamp."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-    return f"{input_file.stem}_{timestamp}.{output_format}"
+    """Generate unique output filename with run timestamp and sequence number."""
+    return f"{input_file.stem}_{_RUN_TIMESTAMP}_{next(_OUTPUT_COUNTER)}.{output_format}"
 
 
 def create_output_path(input_file: Path, output_format: str, output_dir: Path) -> Path:
@@ -48,79 +106,277 @@ def create_output_path(input_file: Path, output_format: str, output_dir: Path) -
 
 def find_ffmpeg_format(output_format: str) -> Optional[str]:
     """Find matching ffmpeg format from format alias."""
-    format_matches = list(filter(lambda fmt: fmt["alias"] == output_format, all_formats))
-    return format_matches[0]["format"] if format_matches else None
+    return _FORMAT_BY_ALIAS.get(output_format)
 
 
-def create_conversion_config(input_file: Path, output_format: str, output_dir: Path) -> Dict[str, Any]:
-    """Create conversion configuration object."""
-    ffmpeg_format = find_ffmpeg_format(output_format)
-    output_path = create_output_path(input_file, output_format, output_dir)
-    
-    return {
-        "input_file": input_file,
-        "output_path": output_path,
-        "ffmpeg_format": ffmpeg_format,
-        "output_format": output_format
-    }
+def detect_available_encoders() -> frozenset:
+    """Detect encoders compiled into the local ffmpeg build, cached after the first call."""
+    global _available_encoders
+    if _available_encoders is None:
+        try:
+            output = subprocess.run(
+                [_FFMPEG_BINARY, "-hide_banner", "-encoders"],
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            output = ""
+        # Encoder lines look like " V....D h264_nvenc    NVIDIA NVENC H.264 encoder"
+        _available_encoders = frozenset(
+            parts[1] for parts in map(str.split, output.splitlines())
+            if len(parts) >= 2 and len(parts[0]) == 6
+        )
+    return _available_encoders
+
 
+@lru_cache(maxsize=None)
+def encoder_works(encoder: str) -> bool:
+    """Check encoder can actually run here with a one frame test encode, cached per encoder.
 
-async def execute_ffmpeg_conversion(config: Dict[str, Any]) -> bool:
-    """Execute ffmpeg conversion with given configuration asynchronously."""
-    if not config["ffmpeg_format"]:
-        print(f"Unsupported format: {config['output_format']}")
+    Builds usually ship nvenc/qsv encoders whether or not the hardware is present.
+    """
+    try:
+        return subprocess.run(
+            [
+                _FFMPEG_BINARY, "-hide_banner", "-loglevel", "error",
+                "-f", "lavfi", "-i", "nullsrc=s=256x256", "-frames:v", "1",
+                "-c:v", encoder, "-f", "null", "-"
+            ],
+            capture_output=True,
+            timeout=ENCODER_PROBE_TIMEOUT
+        ).returncode == 0
+    except (OSError, subprocess.SubprocessError):
         return False
 
-    def _convert():
+
+def select_video_encoder(output_format: str, hwaccel: str) -> Optional[str]:
+    """Select hardware video encoder for output format, None means ffmpeg's default encoder."""
+    codec_family = hw_codec_families.get(output_format)
+    if codec_family is None or hwaccel == "none":
+        return None
+
+    backends = hw_encoder_backends if hwaccel == "auto" else [hwaccel]
+    available = detect_available_encoders()
+    encoder = next(
+        (
+            f"{codec_family}_{backend}" for backend in backends
+            if f"{codec_family}_{backend}" in available and encoder_works(f"{codec_family}_{backend}")
+        ),
+        None
+    )
+    if encoder is None and hwaccel != "auto":
+        print(f"Hardware encoder {codec_family}_{hwaccel} not available, using software encoder")
+    return encoder
+
+
+def create_output_options(
+    output_format: str,
+    hwaccel: str = "none",
+    preset: Optional[str] = None,
+    crf: Optional[int] = None
+) -> Dict[str, Any]:
+    """Create ffmpeg output options shared by every file of a batch."""
+    options = {"threads": 0, **format_output_options.get(output_format, {})}
+
+    vcodec = select_video_encoder(output_format, hwaccel)
+    if vcodec:
+        options["vcodec"] = vcodec
+    elif output_format in preset_formats:
+        # preset/crf values are libx264 specific, hardware encoders use their own scales
+        if preset:
+            options["preset"] = preset
+        if crf is not None:
+            options["crf"] = crf
+
+    return options
+
+
+@dataclass(slots=True)
+class ConversionJob:
+    """Single input file and where/how ffmpeg should write it."""
+    input_file: Path
+    output_path: Path
+    ffmpeg_format: str
+    output_format: str
+    output_options: Dict[str, Any] = field(default_factory=dict)
+    stream_copy: bool = False
+
+
+def create_conversion_job(
+    input_file: Path,
+    output_format: str,
+    ffmpeg_format: str,
+    output_dir: Path,
+    output_options: Optional[Dict[str, Any]] = None,
+    allow_stream_copy: bool = True
+) -> ConversionJob:
+    """Create conversion job for a single input file, allow_stream_copy=False always re-encodes."""
+    return ConversionJob(
+        input_file,
+        output_dir / generate_output_filename(input_file, output_format),
+        ffmpeg_format,
+        output_format,
+        output_options or {},
+        allow_stream_copy and is_remux(input_file.suffix.lstrip(".").lower(), output_format)
+    )
+
+
+def is_remux(input_ext: str, output_format: str) -> bool:
+    """Check if streams can usually be copied into the target container instead of re-encoded."""
+    return input_ext == output_format or (input_ext, output_format) in _REMUX_PAIRS
+
+
+async def run_ffmpeg_command(command: List[str], description: str, report_errors: bool = True) -> bool:
+    """Run compiled ffmpeg command as a child process of the event loop.
+
+    Spawning is retried with backoff on transient OS errors such as EAGAIN,
+    a missing or non executable ffmpeg is raised right away.
+    """
+    retries = get_max_retries_default()
+    for attempt in itertools.count():
         try:
-            ffmpeg.input(str(config["input_file"])).output(
-                str(config["output_path"]), 
-                format=config["ffmpeg_format"]
-            ).run(quiet=True, overwrite_output=True)
-            return True
-        except Exception as e:
-            print(f"Error converting {config['input_file']}: {e}")
-            return False
-    
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, _convert)
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            break
+        except (FileNotFoundError, PermissionError):
+            raise
+        except OSError:
+            if attempt >= retries:
+                raise
+            await asyncio.sleep(RETRY_DELAY * 2 ** attempt)
+    _, stderr = await process.communicate()
+
+    if process.returncode != 0:
+        if report_errors:
+            error = stderr.decode(errors="replace").strip() if stderr else f"exit code {process.returncode}"
+            print(f"Error converting {description}: {error}")
+        return False
+    return True
+
+
+def build_output_arguments(job: ConversionJob) -> List[str]:
+    """Build ffmpeg arguments for one output file from its conversion job."""
+    arguments = ["-f", job.ffmpeg_format]
+    options = job.output_options
+    if job.stream_copy:
+        arguments.extend(("-c", "copy"))
+        options = {option: value for option, value in options.items() if option not in _ENCODER_OPTIONS}
+    for option, value in options.items():
+        arguments.extend((f"-{option}", str(value)))
+    arguments.append(str(job.output_path))
+    return arguments
+
+
+def build_ffmpeg_command(job: ConversionJob) -> List[str]:
+    """Build ffmpeg argv converting a single input file."""
+    return [
+        _FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y",
+        "-threads", "0", "-i", str(job.input_file),
+        *build_output_arguments(job)
+    ]
+
+
+def build_multi_output_command(jobs: List[ConversionJob], stream: str) -> List[str]:
+    """Build ffmpeg argv converting several inputs, mapping each input to its own output."""
+    command = [_FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y"]
+    for job in jobs:
+        command.extend(("-threads", "0", "-i", str(job.input_file)))
+    for index, job in enumerate(jobs):
+        command.extend(("-map", f"{index}:{stream}", *build_output_arguments(job)))
+    return command
+
+
+async def execute_ffmpeg_conversion(job: ConversionJob) -> bool:
+    """Execute ffmpeg conversion for a single job asynchronously."""
+    try:
+        if job.stream_copy:
+            # Codecs the target container can't hold fail fast, then get re-encoded
+            if await run_ffmpeg_command(build_ffmpeg_command(job), str(job.input_file), report_errors=False):
+                return True
+            job = replace(job, stream_copy=False)
+        return await run_ffmpeg_command(build_ffmpeg_command(job), str(job.input_file))
+    except OSError as e:
+        print(f"Error converting {job.input_file}: {e}")
+        return False
+
+
+async def execute_ffmpeg_multi_output_conversion(jobs: List[ConversionJob], stream: str) -> bool:
+    """Convert several files with one ffmpeg process, one input and one output per file."""
+    try:
+        command = build_multi_output_command(jobs, stream)
+        return await run_ffmpeg_command(command, f"batch of {len(jobs)} file(s)")
+    except OSError as e:
+        print(f"Error converting batch of {len(jobs)} file(s): {e}")
+        return False
 
 
 async def convert_single_file_functional(
     input_file: Path, 
     output_format: str, 
-    output_dir: Path
+    ffmpeg_format: str,
+    output_dir: Path,
+    output_options: Optional[Dict[str, Any]] = None,
+    allow_stream_copy: bool = True
 ) -> Dict[str, Any]:
     """Convert single file using functional approach with detailed result."""
-    config = create_conversion_config(input_file, output_format, output_dir)
-    success = await execute_ffmpeg_conversion(config)
+    job = create_conversion_job(input_file, output_format, ffmpeg_format, output_dir, output_options, allow_stream_copy)
+    success = await execute_ffmpeg_conversion(job)
     
     return {
         "input_file": str(input_file),
-        "output_file": str(config["output_path"]) if success else None,
+        "output_file": str(job.output_path) if success else None,
         "success": success,
         "format": output_format
     }
 
 
+async def run_worker_pool(items: List[Any], worker, max_concurrent: int) -> List[Any]:
+    """Run worker over items with at most max_concurrent tasks alive, results in input order."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for index, item in enumerate(items):
+        queue.put_nowait((index, item))
+    results: List[Any] = [None] * len(items)
+
+    async def consume() -> None:
+        while not queue.empty():
+            index, item = queue.get_nowait()
+            results[index] = await worker(item)
+
+    async with asyncio.TaskGroup() as task_group:
+        for _ in range(min(max(max_concurrent, 1), len(items))):
+            task_group.create_task(consume())
+
+    return results
+
+
 async def process_conversion_batch(
     input_files: List[Path], 
     output_format: str, 
+    ffmpeg_format: str,
     output_dir: Path,
-    max_concurrent: int = 1
+    max_concurrent: int = 1,
+    output_options: Optional[Dict[str, Any]] = None,
+    files_per_process: int = 1,
+    allow_stream_copy: bool = True
 ) -> List[Dict[str, Any]]:
     """Process batch conversion using async concurrency control."""
     
     async def convert_with_feedback(input_file: Path) -> Dict[str, Any]:
         try:
-            result = await convert_single_file_functional(input_file, output_format, output_dir)
+            result = await convert_single_file_functional(
+                input_file, output_format, ffmpeg_format, output_dir, output_options, allow_stream_copy
+            )
             if result["success"]:
-                print(f"[OK] Converted {input_file.name}")
+                write_status_lines([f"[OK] Converted {input_file.name}"])
             else:
-                print(f"[FAIL] Failed to convert {input_file.name}")
+                write_status_lines([f"[FAIL] Failed to convert {input_file.name}"])
             return result
         except Exception as e:
-            print(f"[ERROR] Error converting {input_file.name}: {e}")
+            write_status_lines([f"[ERROR] Error converting {input_file.name}: {e}"])
             return {
                 "input_file": str(input_file),
                 "output_file": None,
@@ -129,6 +385,40 @@ async def process_conversion_batch(
                 "error": str(e)
             }
     
+    async def convert_group_with_feedback(group: List[Path]) -> List[Dict[str, Any]]:
+        jobs = [
+            create_conversion_job(input_file, output_format, ffmpeg_format, output_dir, output_options, allow_stream_copy)
+            for input_file in group
+        ]
+        if await execute_ffmpeg_multi_output_conversion(jobs, multi_output_stream):
+            write_status_lines([f"[OK] Converted {input_file.name}" for input_file in group])
+            return [
+                {
+                    "input_file": str(job.input_file),
+                    "output_file": str(job.output_path),
+                    "success": True,
+                    "format": output_format
+                }
+                for job in jobs
+            ]
+
+        # One bad input fails the whole process, retry one by one to isolate it
+        for job in jobs:
+            job.output_path.unlink(missing_ok=True)
+        return [await convert_with_feedback(input_file) for input_file in group]
+
+    multi_output_stream = _MULTI_OUTPUT_STREAMS.get(output_format)
+    if multi_output_stream and files_per_process > 1 and len(input_files) > 1:
+        # Small image/audio conversions, share ffmpeg startup cost across several files
+        groups = [
+            input_files[start:start + files_per_process]
+            for start in range(0, len(input_files), files_per_process)
+        ]
+        print(f"Converting {len(input_files)} file(s) to {output_format} using {len(groups)} ffmpeg process(es)...")
+
+        group_results = await run_worker_pool(groups, convert_group_with_feedback, max_concurrent)
+        return [result for results in group_results for result in results]
+
     if len(input_files) == 1 or max_concurrent <= 1:
         # Sequential conversion for single files or when max_concurrent is 1
         print(f"Converting {len(input_files)} file(s) to {output_format}...")
@@ -141,48 +431,20 @@ async def process_conversion_batch(
         # Concurrent conversion for multiple files
         print(f"Converting {len(input_files)} file(s) to {output_format} using max {max_concurrent} concurrent conversions...")
         
-        # Use semaphore to limit concurrent conversions
-        semaphore = asyncio.Semaphore(max_concurrent)
-        
-        async def convert_with_semaphore(input_file: Path):
-            async with semaphore:
-                return await convert_with_feedback(input_file)
-        
-        tasks = [convert_with_semaphore(input_file) for input_file in input_files]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Handle exceptions in results
-        processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                processed_results.append({
-                    "input_file": str(input_files[i]),
-                    "output_file": None,
-                    "success": False,
-                    "format": output_format,
-                    "error": str(result)
-                })
-            else:
-                processed_results.append(result)
-        
-        return processed_results
+        return await run_worker_pool(input_files, convert_with_feedback, max_concurrent)
 
 
 def calculate_conversion_stats(results: List[Dict[str, Any]]) -> Dict[str, int]:
     """Calculate conversion statistics from results."""
-    return reduce(
-        lambda acc, result: {
-            "total": acc["total"] + 1,
-            "success": acc["success"] + (1 if result["success"] else 0),
-            "failed": acc["failed"] + (0 if result["success"] else 1)
-        },
-        results,
-        {"total": 0, "success": 0, "failed": 0}
-    )
+    total = len(results)
+    success = sum(1 for result in results if result["success"])
+    return {"total": total, "success": success, "failed": total - success}
 
 
 def format_conversion_summary(stats: Dict[str, int], output_format: str, output_dir: str) -> str:
     """Format conversion summary message."""
+    import textwrap
+
     return textwrap.dedent(f"""
         Summary:
         Successfully converted: {stats['success']}
@@ -210,13 +472,46 @@ async def convert_files_functional(
     input_files: List[Path], 
     output_format: str, 
     output_dir: Optional[str] = None,
-    max_workers: int = 1
+    max_workers: int = 1,
+    hwaccel: Optional[str] = None,
+    preset: Optional[str] = None,
+    crf: Optional[int] = None,
+    report: bool = True
 ) -> List[Dict[str, Any]]:
-    """Convert batch of files using async concurrency."""
+    """Convert batch of files using async concurrency, encoder settings default to config.
+
+    Pass report=False to skip the summary, e.g. when the caller prints one for several batches.
+    """
+    # Resolved once for the whole batch, fails before any ffmpeg process is started
+    ffmpeg_format = find_ffmpeg_format(output_format)
+    if not ffmpeg_format:
+        raise ValueError(f"Unsupported format: {output_format}")
+
     resolved_output_dir = ensure_output_directory(output_dir)
+    # A stream copy drops encoder options, so an explicit quality or preset means re-encode;
+    # the config default preset only applies when a file has to be encoded anyway
+    allow_stream_copy = crf is None and preset is None
+    # Hardware encoder probes spawn ffmpeg and wait on it, keep them off the event loop
+    output_options = await asyncio.to_thread(
+        create_output_options,
+        output_format,
+        hwaccel if hwaccel is not None else get_hwaccel_default(),
+        preset if preset is not None else get_video_preset_default(),
+        crf
+    )
     
-    results = await process_conversion_batch(input_files, output_format, resolved_output_dir, max_workers)
-    print_conversion_results(results, output_format, str(resolved_output_dir))
+    results = await process_conversion_batch(
+        input_files,
+        output_format,
+        ffmpeg_format,
+        resolved_output_dir,
+        max_workers,
+        output_options,
+        get_files_per_process_default(),
+        allow_stream_copy
+    )
+    if report:
+        print_conversion_results(results, output_format, str(resolved_output_dir))
     
     return results
 
@@ -227,17 +522,28 @@ def validate_conversion_args(args) -> Dict[str, Any]:
         raise ValueError("Input path is required")
     if not hasattr(args, 'to') or not args.to:
         raise ValueError("Output format is required")
+    if args.to not in _FORMAT_BY_ALIAS:
+        raise ValueError(f"Unsupported format: {args.to}")
     
     # Get max_workers from CLI args or config default
     max_workers = getattr(args, 'max_workers', None)
     if max_workers is None:
-        max_workers = get_max_workers_default()
+        max_workers = get_conversion_max_workers_default()
+
+    # Get hardware encoder backend from CLI args or config default
+    hwaccel = getattr(args, 'hwaccel', None)
+    if hwaccel is None:
+        hwaccel = get_hwaccel_default()
     
     return {
         "input_pattern": args.path,
         "output_format": args.to,
         "output_dir": getattr(args, 'output_dir', None),
-        "max_workers": max_workers
+        "max_workers": max_workers,
+        "hwaccel": hwaccel,
+        # Left None when not given, convert_files_functional applies the config default
+        "preset": getattr(args, 'preset', None),
+        "crf": getattr(args, 'quality', None)
     }
 
 
@@ -251,7 +557,10 @@ async def convert(args) -> List[Dict[str, Any]]:
             input_files,
             validated_args["output_format"],
             validated_args["output_dir"],
-            validated_args["max_workers"]
+            validated_args["max_workers"],
+            validated_args["hwaccel"],
+            validated_args["preset"],
+            validated_args["crf"]
         )
         
     except Exception as e:
@@ -1,20 +1,33 @@
 import asyncio
 import os
 import sys
-from typing import Optional, Dict, Any, List
-from functools import reduce
-from ..utils.media_format import video_formats, get_format, audio_formats
+from pathlib import Path
+from typing import Optional, Dict, Any, Awaitable, Callable, List
+from functools import lru_cache, partial
+from ..utils.media_format import video_format_index, audio_format_index
 from ..utils.config import (
     get_output_dir_default,
     get_video_format_default,
     get_audio_format_default,
     get_video_resolution_default,
     get_max_workers_default,
+    get_audio_max_workers_default,
     should_create_playlist_subfolders,
 )
 from . import media_converter
 from . import youtube_downloader
 
+# Async entry points, helpers stay importable by name but are not star-exported
+__all__ = [
+    "download",
+    "route_video_download",
+    "route_audio_download",
+    "download_single_video",
+    "download_single_audio",
+    "download_playlist_videos",
+    "download_playlist_audios",
+]
+
 
 def get_output_dir() -> str:
     """Get default output directory from config."""
@@ -28,27 +41,28 @@ def ensure_directory_exists(path: str) -> str:
     return path
 
 
-def get_format_or_default(format_arg: Optional[str], format_map: list, default: str) -> str:
-    """Get format with fallback to default."""
+def get_format_or_default(format_arg: Optional[str], format_index: Dict[str, str], default: str) -> str:
+    """Get format alias with fallback to default."""
     if format_arg is None:
         return default
     
-    formats = get_format(format_arg, format_map)
-    if not formats:
+    # Alias, not ffmpeg muxer name, it is compared to file extensions and passed to convert
+    alias = format_index.get(format_arg)
+    if alias is None:
         raise ValueError(f"Unsupported format: {format_arg}")
-    return formats[0]["format"]
+    return alias
 
 
 def get_video_format_or_default(format_arg: Optional[str]) -> str:
     """Get video format with config default."""
-    return get_format_or_default(format_arg, video_formats, get_video_format_default())
+    return get_format_or_default(format_arg, video_format_index, get_video_format_default())
 
 
 def get_audio_format_or_default(format_arg: Optional[str]) -> Optional[str]:
     """Get audio format with config default."""
     if format_arg is None:
         return None  # Return None to indicate no conversion needed
-    return get_format_or_default(format_arg, audio_formats, get_audio_format_default())
+    return get_format_or_default(format_arg, audio_format_index, get_audio_format_default())
 
 
 def create_output_path(base_dir: str, media_type: str, subfolder: Optional[str] = None) -> str:
@@ -59,6 +73,7 @@ def create_output_path(base_dir: str, media_type: str, subfolder: Optional[str]
     return os.path.join(*path_components)
 
 
+@lru_cache(maxsize=1024)
 def extract_file_extension(filepath: str) -> str:
     """Extract file extension from filepath."""
     return os.path.splitext(filepath)[1][1:].lower()
@@ -72,7 +87,7 @@ def should_convert_format(current_ext: str, target_format: str) -> bool:
     return current_ext.lower() != target_format.lower()
 
 
-async def convert_if_needed(downloaded_file: str, target_format: str, args) -> str:
+async def convert_if_needed(downloaded_file: str, target_format: str) -> str:
     """Convert media file if format differs from target."""
     if not downloaded_file or target_format is None:
         return downloaded_file
@@ -82,14 +97,15 @@ async def convert_if_needed(downloaded_file: str, target_format: str, args) -> s
     if should_convert_format(current_ext, target_format):
         print(f"Converting to {target_format} format...")
         
-        args.path = downloaded_file 
-        args.to = target_format 
-        args.output_dir = os.path.dirname(downloaded_file)
-        
-        results = await media_converter.convert(args)
+        # Same batch entry point as playlist conversion, no CLI args round trip
+        results = await media_converter.convert_files_functional(
+            [Path(downloaded_file)],
+            target_format,
+            os.path.dirname(downloaded_file)
+        )
         
         if results and len(results) > 0 and results[0]["success"]:
-            os.remove(downloaded_file)
+            await asyncio.to_thread(os.remove, downloaded_file)
             return results[0]["output_file"]
         else:
             print(f"Failed to convert {downloaded_file}")
@@ -135,6 +151,8 @@ def create_playlist_config(args, media_type: str) -> Dict[str, Any]:
             try:
                 playlist = youtube_downloader.create_playlist_instance(args.url)
                 playlist_title = playlist.title
+                # Keep the fetched playlist so the download does not fetch it again
+                config["playlist"] = playlist
             except Exception:
                 playlist_title = "unknown_playlist"
         else:
@@ -154,37 +172,44 @@ def create_playlist_config(args, media_type: str) -> Dict[str, Any]:
     return config
 
 
+def finalize_download_result(
+    result: Dict[str, Any],
+    config: Dict[str, Any],
+    file_path: Optional[str] = None,
+    was_converted: bool = False
+) -> Dict[str, Any]:
+    """Turn a raw download result into its summary entry in place, reusing the dict."""
+    metadata = result.pop("metadata")
+    result["title"] = metadata.get("title", "Unknown")
+    result["path"] = config["output_path"]
+    result["converted"] = was_converted
+
+    if result["success"]:
+        result["file_path"] = file_path
+        # If no target format specified, use the original file's extension
+        result["format"] = config["output_format"] or extract_file_extension(file_path)
+    else:
+        result["format"] = config["output_format"] or "original"
+        result["error"] = metadata.get("error", "Download failed")
+    return result
+
+
 async def process_single_download_result(result: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
     """Process single download result with conversion if needed."""
     if not result["success"]:
-        return {
-            "success": False,
-            "title": result["metadata"].get("title", "Unknown"),
-            "path": config["output_path"],
-            "format": config["output_format"] or "original",
-            "converted": False,
-            "error": result["metadata"].get("error", "Download failed")
-        }
+        return finalize_download_result(result, config)
     
     original_file = result["file_path"]
-    converted_file = await convert_if_needed(
-        result["file_path"], 
-        config["output_format"], 
-        config["args"]
-    )
-    was_converted = converted_file != original_file
-    
-    # If no target format specified, use the original file's extension
-    final_format = config["output_format"] or extract_file_extension(converted_file)
-    
-    return {
-        "success": True,
-        "title": result["metadata"]["title"],
-        "path": config["output_path"],
-        "format": final_format,
-        "converted": was_converted,
-        "file_path": converted_file
-    }
+    converted_file = await convert_if_needed(result["file_path"], config["output_format"])
+    return finalize_download_result(result, config, converted_file, converted_file != original_file)
+
+
+def remove_file_quietly(file_path: str) -> None:
+    """Remove file, ignoring filesystem errors but not interrupts or cancellation."""
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
 
 
 def collect_downloaded_files(results: List[Dict[str, Any]]) -> List[str]:
@@ -192,96 +217,117 @@ def collect_downloaded_files(results: List[Dict[str, Any]]) -> List[str]:
     return [result["file_path"] for result in results if result["success"] and result["file_path"]]
 
 
-async def batch_convert_playlist_files(downloaded_files: List[str], target_format: str) -> List[Dict[str, Any]]:
-    """Batch convert playlist files using media_converter."""
-    if not downloaded_files:
-        return []
-    
-    # Check if conversion is needed
-    files_to_convert = []
-    for file_path in downloaded_files:
-        current_ext = extract_file_extension(file_path)
-        if should_convert_format(current_ext, target_format):
-            files_to_convert.append(file_path)
-    
+async def batch_convert_playlist_files(
+    files_to_convert: List[str],
+    target_format: str,
+    report: bool = True
+) -> List[Dict[str, Any]]:
+    """Batch convert playlist files that need conversion using media_converter, report prints the summary."""
     if not files_to_convert:
         return []
     
     print(f"Batch converting {len(files_to_convert)} files to {target_format} format...")
     
     # Use media_converter for batch processing with async support
-    from pathlib import Path
-    input_files = [Path(f) for f in files_to_convert]
     max_workers = get_max_workers_default()
-    conversion_results = await media_converter.convert_files_functional(input_files, target_format, max_workers=max_workers)
+    conversion_results = await media_converter.convert_files_functional(
+        list(map(Path, files_to_convert)), target_format, max_workers=max_workers, report=report
+    )
     
-    # Clean up original files that were successfully converted
-    for i, result in enumerate(conversion_results):
-        if result["success"]:
-            try:
-                os.remove(files_to_convert[i])
-            except:
-                pass  # Ignore cleanup errors
+    # Clean up original files that were successfully converted, off the event loop
+    await asyncio.gather(*(
+        asyncio.to_thread(remove_file_quietly, file_path)
+        for file_path, result in zip(files_to_convert, conversion_results)
+        if result["success"]
+    ))
     
     return conversion_results
 
 
-async def process_playlist_results(results: List[Dict[str, Any]], config: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Process playlist download results with batch conversion."""
-    # First, collect all downloaded files
-    downloaded_files = collect_downloaded_files(results)
-    
-    # Check if any conversion is needed
+async def run_playlist_pipeline(
+    download_playlist: Callable[..., Awaitable[List[Dict[str, Any]]]],
+    config: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """Download playlist items while converting finished ones, instead of converting after all downloads."""
     target_format = config["output_format"]
-    if target_format is None:
-        # No conversion needed, return results as-is
-        conversion_map = {}
-        needs_conversion = False
-    else:
-        needs_conversion = any(
-            should_convert_format(extract_file_extension(file), target_format)
-            for file in downloaded_files
+    max_workers = get_max_workers_default()
+    conversion_queue: asyncio.Queue = asyncio.Queue()
+    conversion_map: Dict[str, Dict[str, Any]] = {}
+    conversion_results: List[Dict[str, Any]] = []
+
+    async def enqueue_for_conversion(result: Dict[str, Any]) -> None:
+        file_path = result["file_path"] if result["success"] else None
+        if file_path and should_convert_format(extract_file_extension(file_path), target_format):
+            await conversion_queue.put(file_path)
+
+    async def convert_downloads() -> None:
+        finished = False
+        while not finished:
+            # Wait for one finished download, then take whatever else is already queued
+            batch = [await conversion_queue.get()]
+            while len(batch) < max_workers and not conversion_queue.empty():
+                batch.append(conversion_queue.get_nowait())
+            if None in batch:
+                finished = True
+                batch = [file_path for file_path in batch if file_path is not None]
+            if batch:
+                # One summary for the whole playlist, printed once the last batch is in
+                batch_results = await batch_convert_playlist_files(batch, target_format, report=False)
+                conversion_results.extend(batch_results)
+                conversion_map.update((result["input_file"], result) for result in batch_results)
+
+    if not target_format:
+        results = await download_playlist()
+        return await process_playlist_results(results, config, conversion_map)
+
+    async with asyncio.TaskGroup() as task_group:
+        task_group.create_task(convert_downloads())
+        try:
+            results = await download_playlist(on_complete=enqueue_for_conversion)
+        finally:
+            conversion_queue.put_nowait(None)  # Sentinel, converter exits after draining
+
+    if conversion_results:
+        media_converter.print_conversion_results(
+            conversion_results, target_format, str(media_converter.get_output_directory(None))
         )
-    
-    if needs_conversion:
-        # Batch convert all files
-        conversion_results = await batch_convert_playlist_files(downloaded_files, target_format)
-        conversion_map = {result["input_file"]: result for result in conversion_results}
-    else:
+    return await process_playlist_results(results, config, conversion_map)
+
+
+async def process_playlist_results(
+    results: List[Dict[str, Any]],
+    config: Dict[str, Any],
+    conversion_map: Optional[Dict[str, Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
+    """Process playlist download results, batch converting them unless already converted."""
+    if conversion_map is None:
+        downloaded_files = collect_downloaded_files(results)
+
+        # Single pass over the downloads to pick the files needing conversion
+        target_format = config["output_format"]
+        files_to_convert = [
+            file for file in downloaded_files
+            if should_convert_format(extract_file_extension(file), target_format)
+        ] if target_format else []
+
         conversion_map = {}
+        if files_to_convert:
+            conversion_results = await batch_convert_playlist_files(files_to_convert, target_format)
+            conversion_map = {result["input_file"]: result for result in conversion_results}
     
     # Process results with conversion info
-    processed_results = []
     for result in results:
         if not result["success"]:
-            processed_results.append({
-                "success": False,
-                "title": result["metadata"].get("title", "Unknown"),
-                "path": config["output_path"],
-                "format": config["output_format"] or "original",
-                "converted": False,
-                "error": result["metadata"].get("error", "Download failed")
-            })
-        else:
-            file_path = result["file_path"]
-            conversion_result = conversion_map.get(file_path)
-            was_converted = conversion_result is not None and conversion_result["success"]
-
-            final_file_path = conversion_result["output_file"] if was_converted else file_path
-            
-            # If no target format specified, use the original file's extension
-            final_format = config["output_format"] or extract_file_extension(final_file_path)
-            
-            processed_results.append({
-                "success": True,
-                "title": result["metadata"]["title"],
-                "path": config["output_path"],
-                "format": final_format,
-                "converted": was_converted,
-                "file_path": final_file_path
-            })
+            finalize_download_result(result, config)
+            continue
+
+        file_path = result["file_path"]
+        conversion_result = conversion_map.get(file_path)
+        was_converted = conversion_result is not None and conversion_result["success"]
+        final_file_path = conversion_result["output_file"] if was_converted else file_path
+        finalize_download_result(result, config, final_file_path, was_converted)
     
-    return processed_results
+    return results
 
 
 async def download_single_video(config: Dict[str, Any]) -> Dict[str, Any]:
@@ -344,14 +390,16 @@ async def download_playlist_videos(config: Dict[str, Any]) -> List[Dict[str, Any
         max_workers = get_max_workers_default()
         
         # Always use the async function with concurrency control
-        results = await youtube_downloader.download_playlist_videos(
+        download_playlist = partial(
+            youtube_downloader.download_playlist_videos,
             config["url"],
             config["output_path"],
             config["resolution"],
-            max_concurrent=max_workers
+            max_concurrent=max_workers,
+            playlist=config.get("playlist")
         )
         
-        return await process_playlist_results(results, config)
+        return await run_playlist_pipeline(download_playlist, config)
         
     except Exception as e:
         return [{
@@ -365,16 +413,18 @@ async def download_playlist_videos(config: Dict[str, Any]) -> List[Dict[str, Any
 async def download_playlist_audios(config: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Download playlist audios using async approach with concurrency control."""
     try:
-        max_workers = get_max_workers_default()
+        max_workers = get_audio_max_workers_default()
         
         # Always use the async function with concurrency control
-        results = await youtube_downloader.download_playlist_audios(
+        download_playlist = partial(
+            youtube_downloader.download_playlist_audios,
             config["url"],
             config["output_path"],
-            max_concurrent=max_workers
+            max_concurrent=max_workers,
+            playlist=config.get("playlist")
         )
         
-        return await process_playlist_results(results, config)
+        return await run_playlist_pipeline(download_playlist, config)
         
     except Exception as e:
         return [{
@@ -393,7 +443,8 @@ async def route_video_download(args) -> Dict[str, Any] | List[Dict[str, Any]]:
         raise ValueError(f"Unsupported URL: {args.url}, currently only YouTube URLs are supported.")
     
     if url_validation["is_playlist"]:
-        config = create_playlist_config(args, "video")
+        # Fetching the playlist title is network I/O, keep it off the event loop
+        config = await asyncio.to_thread(create_playlist_config, args, "video")
         return await download_playlist_videos(config)
     else:
         config = create_download_config(args, "video")
@@ -408,7 +459,8 @@ async def route_audio_download(args) -> Dict[str, Any] | List[Dict[str, Any]]:
         raise ValueError(f"Unsupported URL: {args.url}, currently only YouTube URLs are supported.")
     
     if url_validation["is_playlist"]:
-        config = create_playlist_config(args, "audio")
+        # Fetching the playlist title is network I/O, keep it off the event loop
+        config = await asyncio.to_thread(create_playlist_config, args, "audio")
         return await download_playlist_audios(config)
     else:
         config = create_download_config(args, "audio")
@@ -417,15 +469,9 @@ async def route_audio_download(args) -> Dict[str, Any] | List[Dict[str, Any]]:
 
 def calculate_success_stats(results: List[Dict[str, Any]]) -> Dict[str, int]:
     """Calculate download statistics from results."""
-    return reduce(
-        lambda acc, result: {
-            "total": acc["total"] + 1,
-            "success": acc["success"] + (1 if result["success"] else 0),
-            "failed": acc["failed"] + (0 if result["success"] else 1)
-        },
-        results,
-        {"total": 0, "success": 0, "failed": 0}
-    )
+    total = len(results)
+    success = sum(1 for result in results if result["success"])
+    return {"total": total, "success": success, "failed": total - success}
 
 
 def print_download_summary(results) -> None:
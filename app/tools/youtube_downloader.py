@@ -1,13 +1,89 @@
 import asyncio
-from typing import Optional, Dict, Any, Callable, List
-from functools import partial
+import atexit
+import os
+import shutil
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional, Dict, Any, Awaitable, Callable, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+from functools import lru_cache, partial
 from pytubefix import YouTube, Playlist
 from pytubefix.cli import on_progress
+from ..utils.console import write_status_lines
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+# Hosts accepted as YouTube, subdomains such as www. and m. included
+YOUTUBE_DOMAINS = ("youtube.com", "youtu.be")
+YOUTUBE_HOSTS = frozenset({*YOUTUBE_DOMAINS, "www.youtube.com", "m.youtube.com", "music.youtube.com"})
+YOUTUBE_SUBDOMAIN_SUFFIXES = tuple(f".{domain}" for domain in YOUTUBE_DOMAINS)
+
+# Bytes per read from the media response, large enough to keep the TCP window full
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+# Bytes per ranged request, media hosts throttle unranged whole-file requests
+RANGE_SIZE = 9 * 1024 * 1024
+
+# Seconds to wait on the media host before giving up a ranged request
+REQUEST_TIMEOUT = 30
+
+# Keep-alive connections per host, comfortably above concurrent playlist downloads
+POOL_MAXSIZE = 32
+
+# Page cache hints for download targets, Linux and other POSIX systems only
+FADVISE_AVAILABLE = hasattr(os, "posix_fadvise")
+
+# Seconds between progress updates for one stream, the final update always goes out
+PROGRESS_INTERVAL = 0.5
+
+# Video streams above this size are bandwidth bound, only LARGE_STREAM_WORKERS
+# of them download at once so they don't split the link between many sockets
+LARGE_STREAM_SIZE = 200 * 1024 * 1024
+LARGE_STREAM_WORKERS = 2
+
+# Shared by every media download so TLS handshakes are paid once per host
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def throttle_progress(
+    on_chunk: Callable[..., None],
+    interval: float = PROGRESS_INTERVAL
+) -> Callable[..., None]:
+    """Wrap progress callback taking bytes_remaining last to fire at most once per interval, plus once on completion."""
+    last_update = -interval
+
+    def throttled(*args) -> None:
+        nonlocal last_update
+        now = time.monotonic()
+        if args[-1] == 0 or now - last_update >= interval:
+            last_update = now
+            on_chunk(*args)
+
+    return throttled
+
+
+# Small on purpose, an instance keeps its parsed watch page, so this only covers
+# video and audio downloads of the same URL close together, not whole playlists
+@lru_cache(maxsize=16)
+def get_youtube(url: str) -> YouTube:
+    """Get YouTube instance for URL, reused so its watch page is parsed once."""
+    return YouTube(url)
 
 
 def create_youtube_instance(url: str, progress_callback: Callable = on_progress) -> YouTube:
-    """Create YouTube instance with progress callback."""
-    return YouTube(url, on_progress_callback=progress_callback)
+    """Create YouTube instance with progress callback, throttled like the ranged download path."""
+    yt = get_youtube(url)
+    if progress_callback is not None:
+        yt.register_on_progress_callback(throttle_progress(progress_callback))
+    return yt
 
 
 def create_playlist_instance(url: str) -> Playlist:
@@ -27,9 +103,96 @@ def select_audio_stream(yt: YouTube):
     return yt.streams.get_audio_only()
 
 
-def download_stream(stream, output_path: str) -> Optional[str]:
+def get_http_session():
+    """Get pooled requests session shared by media downloads, created on first use."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=POOL_MAXSIZE))
+            atexit.register(session.close)
+            _http_session = session
+    return _http_session
+
+
+def download_url_to_path(
+    stream_url: str,
+    file_path: str,
+    file_size: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_chunk: Optional[Callable[[bytes, int], None]] = None
+) -> str:
+    """Stream media URL into file in ranged requests, reading chunk_size bytes at a time.
+
+    Bytes land in a .part file named after the expected size, so an interrupted run
+    resumes only a download of the same stream. The file is moved to file_path once
+    it holds exactly file_size bytes, a complete file from an earlier run is kept as is.
+    """
+    if file_size <= 0:
+        raise ValueError(f"Unknown stream size for {file_path}")
+    if os.path.exists(file_path) and os.path.getsize(file_path) == file_size:
+        return file_path
+
+    part_path = f"{file_path}.{file_size}.part"
+    downloaded = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if downloaded > file_size:
+        downloaded = 0
+
+    session = get_http_session()
+    with open(part_path, "ab" if downloaded else "wb", buffering=1 << 20) as file_handle:
+        if FADVISE_AVAILABLE:
+            os.posix_fadvise(file_handle.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        while downloaded < file_size:
+            stop = min(downloaded + RANGE_SIZE, file_size) - 1
+            with session.get(f"{stream_url}&range={downloaded}-{stop}", stream=True, timeout=REQUEST_TIMEOUT) as response:
+                response.raise_for_status()
+                if on_chunk is None:
+                    # Nothing to report per chunk, let shutil run the copy loop
+                    start = file_handle.tell()
+                    response.raw.decode_content = True
+                    shutil.copyfileobj(response.raw, file_handle, chunk_size)
+                    received = file_handle.tell() - start
+                else:
+                    received = 0
+                    for chunk in response.iter_content(chunk_size):
+                        file_handle.write(chunk)
+                        received += len(chunk)
+                        on_chunk(chunk, file_size - downloaded - received)
+            if not received:
+                raise IOError(f"Empty response at byte {downloaded} of {file_size}")
+            downloaded += received
+        if FADVISE_AVAILABLE:
+            # Written media is rarely read back right away, release its page cache
+            file_handle.flush()
+            os.posix_fadvise(file_handle.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+    written = os.path.getsize(part_path)
+    if written != file_size:
+        raise IOError(f"Downloaded {written} of {file_size} bytes for {file_path}")
+    os.replace(part_path, file_path)
+    return file_path
+
+
+def download_stream(
+    stream,
+    output_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress_callback: Optional[Callable] = None
+) -> Optional[str]:
     """Download stream to specified output path."""
-    return stream.download(output_path=output_path)
+    # SABR streams need pytubefix's own protocol handling, and ranged requests need a known size
+    if not REQUESTS_AVAILABLE or stream.is_sabr or not stream.filesize:
+        return stream.download(output_path=output_path)
+
+    # A 256 KiB chunk arrives far more often than a progress bar needs redrawing
+    on_chunk = throttle_progress(partial(progress_callback, stream)) if progress_callback is not None else None
+    return download_url_to_path(
+        stream.url,
+        stream.get_file_path(output_path=output_path),
+        stream.filesize,
+        chunk_size,
+        on_chunk
+    )
 
 
 def get_video_metadata(yt: YouTube) -> Dict[str, Any]:
@@ -42,177 +205,236 @@ def get_video_metadata(yt: YouTube) -> Dict[str, Any]:
     }
 
 
-def get_playlist_metadata(playlist: Playlist) -> Dict[str, Any]:
-    """Extract playlist metadata."""
+def get_playlist_metadata(playlist: Playlist, video_count: Optional[int] = None) -> Dict[str, Any]:
+    """Extract playlist metadata, pass video_count when the videos are already materialized."""
+    if video_count is None:
+        video_count = len(list(playlist.videos))
     return {
         "title": playlist.title,
-        "video_count": len(list(playlist.videos)),
+        "video_count": video_count,
         "owner": playlist.owner
     }
 
 
+def resolve_media(
+    url: str,
+    select_stream: Callable[[YouTube], Any],
+    progress_callback: Callable = on_progress,
+    on_start: Optional[Callable[[YouTube], None]] = None
+) -> Tuple[YouTube, Any]:
+    """Blocking resolve of the video and the stream picked by select_stream."""
+    yt = create_youtube_instance(url, progress_callback)
+    if on_start is not None:
+        on_start(yt)
+    return yt, select_stream(yt)
+
+
+def download_resolved(
+    yt: YouTube,
+    stream,
+    output_path: str,
+    progress_callback: Callable = on_progress,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """Blocking download of an already resolved stream."""
+    downloaded_file = download_stream(stream, output_path, chunk_size, progress_callback)
+    metadata = get_video_metadata(yt)
+    return {
+        "success": downloaded_file is not None,
+        "file_path": downloaded_file,
+        "metadata": metadata
+    }
+
+
+def download_media(
+    url: str,
+    output_path: str,
+    select_stream: Callable[[YouTube], Any],
+    progress_callback: Callable = on_progress,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_start: Optional[Callable[[YouTube], None]] = None
+) -> Dict[str, Any]:
+    """Blocking download of the stream picked by select_stream, shared by the video and audio paths."""
+    yt, stream = resolve_media(url, select_stream, progress_callback, on_start)
+    return download_resolved(yt, stream, output_path, progress_callback, chunk_size)
+
+
 async def download_single_video(
     url: str, 
     output_path: str, 
     resolution: Optional[str] = None,
-    progress_callback: Callable = on_progress
+    progress_callback: Callable = on_progress,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_start: Optional[Callable[[YouTube], None]] = None,
+    executor: Optional[Executor] = None,
+    large_stream_slots: Optional[asyncio.Semaphore] = None
 ) -> Dict[str, Any]:
-    """Download single YouTube video asynchronously."""
-    loop = asyncio.get_event_loop()
-    
-    def _download():
-        yt = create_youtube_instance(url, progress_callback)
-        stream = select_video_stream(yt, resolution)
-        downloaded_file = download_stream(stream, output_path)
-        metadata = get_video_metadata(yt)
-        return {
-            "success": downloaded_file is not None,
-            "file_path": downloaded_file,
-            "metadata": metadata
-        }
-    
-    return await loop.run_in_executor(None, _download)
+    """Download single YouTube video asynchronously, on_start runs in the worker with the resolved video.
+
+    Streams over LARGE_STREAM_SIZE wait for one of large_stream_slots when given.
+    """
+    loop = asyncio.get_running_loop()
+    select_stream = lambda yt: select_video_stream(yt, resolution)
+    if large_stream_slots is None:
+        return await loop.run_in_executor(
+            executor, download_media, url, output_path, select_stream, progress_callback, chunk_size, on_start
+        )
+
+    def resolve_with_size() -> Tuple[YouTube, Any, int]:
+        yt, stream = resolve_media(url, select_stream, progress_callback, on_start)
+        # filesize may cost a HEAD request, read it in the worker instead of on the event loop
+        return yt, stream, stream.filesize
+
+    yt, stream, filesize = await loop.run_in_executor(executor, resolve_with_size)
+    # Large streams wait for a slot on the event loop, not in a pool thread,
+    # so small items behind them keep every worker busy
+    async with large_stream_slots if filesize > LARGE_STREAM_SIZE else nullcontext():
+        return await loop.run_in_executor(
+            executor, download_resolved, yt, stream, output_path, progress_callback, chunk_size
+        )
 
 
 async def download_single_audio(
     url: str, 
     output_path: str,
-    progress_callback: Callable = on_progress
+    progress_callback: Callable = on_progress,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_start: Optional[Callable[[YouTube], None]] = None,
+    executor: Optional[Executor] = None
 ) -> Dict[str, Any]:
-    """Download single YouTube audio asynchronously."""
-    loop = asyncio.get_event_loop()
-    
-    def _download():
-        yt = create_youtube_instance(url, progress_callback)
-        stream = select_audio_stream(yt)
-        downloaded_file = download_stream(stream, output_path)
-        metadata = get_video_metadata(yt)
-        return {
-            "success": downloaded_file is not None,
-            "file_path": downloaded_file,
-            "metadata": metadata
-        }
-    
-    return await loop.run_in_executor(None, _download)
+    """Download single YouTube audio asynchronously, on_start runs in the worker with the resolved video."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, download_media, url, output_path, select_audio_stream, progress_callback, chunk_size, on_start
+    )
 
 
-async def download_playlist_videos(
+async def _download_playlist(
     url: str,
     output_path: str,
-    resolution: Optional[str] = None,
-    progress_callback: Callable = on_progress,
-    max_concurrent: int = 3
+    download_item: Callable[..., Awaitable[Dict[str, Any]]],
+    max_concurrent: int = 3,
+    on_complete: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    playlist: Optional[Playlist] = None
 ) -> List[Dict[str, Any]]:
-    """Download all videos from YouTube playlist asynchronously."""
-    playlist = create_playlist_instance(url)
-    playlist_meta = get_playlist_metadata(playlist)
+    """Download every playlist entry with download_item, reporting each result to on_complete.
+
+    download_item is called as download_item(url, output_path, on_start=..., executor=...).
+    Progress is one status line per item, per-chunk progress bars from concurrent
+    downloads would interleave and cost a stdout write per chunk.
+    """
+    # Reuse an already fetched playlist, e.g. the one used for the output folder title
+    if playlist is None:
+        playlist = create_playlist_instance(url)
+    # Materialize once, every pass over playlist.videos walks the playlist again,
+    # in a thread since resolving the entries goes over the network
+    videos = await asyncio.to_thread(lambda: list(playlist.videos))
+    total = len(videos)
     
     async def download_with_info(index: int, yt) -> Dict[str, Any]:
-        print(f"[{index+1}/{playlist_meta['video_count']}] Downloading: {yt.title}")
+        # yt.title is a blocking fetch, so it is only read in the worker thread
+        def announce(resolved: YouTube) -> None:
+            write_status_lines([f"[{index+1}/{total}] Downloading: {resolved.title}"])
+
         try:
-            result = await download_single_video(yt.watch_url, output_path, resolution, progress_callback)
+            result = await download_item(yt.watch_url, output_path, on_start=announce, executor=pool)
+            title = result["metadata"].get("title", yt.watch_url)
             if result["success"]:
-                print(f"[OK] Successfully downloaded {yt.title}")
+                write_status_lines([f"[OK] Successfully downloaded {title}"])
             else:
-                print(f"[FAIL] Failed to download {yt.title}")
+                write_status_lines([f"[FAIL] Failed to download {title}"])
             return result
         except Exception as e:
-            print(f"[FAIL] Error downloading {yt.title}: {e}")
+            write_status_lines([f"[FAIL] Error downloading {yt.watch_url}: {e}"])
             return {
                 "success": False,
                 "file_path": None,
-                "metadata": {"title": yt.title, "error": str(e)}
+                "metadata": {"title": yt.watch_url, "error": str(e)}
             }
     
-    # Use semaphore to limit concurrent downloads
-    semaphore = asyncio.Semaphore(max_concurrent)
-    
-    async def download_with_semaphore(index: int, yt):
-        async with semaphore:
-            return await download_with_info(index, yt)
+    async def download_and_report(index: int, yt):
+        result = await download_with_info(index, yt)
+        # Hand each finished item on right away, e.g. to start converting it
+        if on_complete is not None:
+            await on_complete(result)
+        return result
     
-    tasks = [download_with_semaphore(index, yt) for index, yt in enumerate(playlist.videos)]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # A pool of max_concurrent threads bounds the downloads, instead of a semaphore
+    # in front of the shared default executor
+    pool = ThreadPoolExecutor(max_workers=max(max_concurrent, 1), thread_name_prefix="yt-dl")
+    try:
+        tasks = [download_and_report(index, yt) for index, yt in enumerate(videos)]
+        results = await asyncio.gather(*tasks)
+    finally:
+        # Every item is done on success; on cancellation drop queued items and
+        # return right away instead of blocking the loop on in-flight downloads
+        pool.shutdown(wait=False, cancel_futures=True)
     
-    # Handle exceptions in results
-    processed_results = []
-    for i, result in enumerate(results):
-        if isinstance(result, Exception):
-            processed_results.append({
-                "success": False,
-                "file_path": None,
-                "metadata": {"title": f"video_{i}", "error": str(result)}
-            })
-        else:
-            processed_results.append(result)
-    
-    return processed_results
+    # download_with_info turns failures into result dicts, gather keeps playlist order
+    return results
+
+
+async def download_playlist_videos(
+    url: str,
+    output_path: str,
+    resolution: Optional[str] = None,
+    progress_callback: Optional[Callable] = None,
+    max_concurrent: int = 3,
+    on_complete: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    playlist: Optional[Playlist] = None
+) -> List[Dict[str, Any]]:
+    """Download all videos from YouTube playlist asynchronously, reporting each result to on_complete."""
+    large_stream_slots = asyncio.BoundedSemaphore(max(min(max_concurrent, LARGE_STREAM_WORKERS), 1))
+
+    def download_item(item_url: str, item_output_path: str, on_start, executor) -> Awaitable[Dict[str, Any]]:
+        return download_single_video(
+            item_url, item_output_path, resolution, progress_callback,
+            on_start=on_start, executor=executor, large_stream_slots=large_stream_slots
+        )
+
+    return await _download_playlist(url, output_path, download_item, max_concurrent, on_complete, playlist)
 
 
 async def download_playlist_audios(
     url: str,
     output_path: str,
-    progress_callback: Callable = on_progress,
-    max_concurrent: int = 3
+    progress_callback: Optional[Callable] = None,
+    max_concurrent: int = 3,
+    on_complete: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    playlist: Optional[Playlist] = None
 ) -> List[Dict[str, Any]]:
-    """Download all audios from YouTube playlist asynchronously."""
-    playlist = create_playlist_instance(url)
-    playlist_meta = get_playlist_metadata(playlist)
-    
-    async def download_with_info(index: int, yt) -> Dict[str, Any]:
-        print(f"[{index+1}/{playlist_meta['video_count']}] Downloading: {yt.title}")
-        try:
-            result = await download_single_audio(yt.watch_url, output_path, progress_callback)
-            if result["success"]:
-                print(f"[OK] Successfully downloaded {yt.title}")
-            else:
-                print(f"[FAIL] Failed to download {yt.title}")
-            return result
-        except Exception as e:
-            print(f"[FAIL] Error downloading {yt.title}: {e}")
-            return {
-                "success": False,
-                "file_path": None,
-                "metadata": {"title": yt.title, "error": str(e)}
-            }
-    
-    # Use semaphore to limit concurrent downloads
-    semaphore = asyncio.Semaphore(max_concurrent)
-    
-    async def download_with_semaphore(index: int, yt):
-        async with semaphore:
-            return await download_with_info(index, yt)
-    
-    tasks = [download_with_semaphore(index, yt) for index, yt in enumerate(playlist.videos)]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # Handle exceptions in results
-    processed_results = []
-    for i, result in enumerate(results):
-        if isinstance(result, Exception):
-            processed_results.append({
-                "success": False,
-                "file_path": None,
-                "metadata": {"title": f"audio_{i}", "error": str(result)}
-            })
-        else:
-            processed_results.append(result)
-    
-    return processed_results
+    """Download all audios from YouTube playlist asynchronously, reporting each result to on_complete."""
+    def download_item(item_url: str, item_output_path: str, on_start, executor) -> Awaitable[Dict[str, Any]]:
+        return download_single_audio(
+            item_url, item_output_path, progress_callback, on_start=on_start, executor=executor
+        )
+
+    return await _download_playlist(url, output_path, download_item, max_concurrent, on_complete, playlist)
+
+
+@lru_cache(maxsize=256)
+def split_url(url: str) -> Tuple[str, frozenset]:
+    """Split URL once into lowercase host and query parameter names."""
+    # Scheme-less input such as "youtu.be/id" would otherwise parse as a bare path
+    parts = urlsplit(url if "//" in url else f"//{url}")
+    return parts.hostname or "", frozenset(parse_qs(parts.query))
 
 
 def is_youtube_url(url: str) -> bool:
     """Check if URL is a YouTube URL."""
-    return "youtube.com" in url or "youtu.be" in url
+    host, _ = split_url(url)
+    # Common hosts hit the set, other subdomains fall back to one suffix check
+    return host in YOUTUBE_HOSTS or host.endswith(YOUTUBE_SUBDOMAIN_SUFFIXES)
 
 
 def is_playlist_url(url: str) -> bool:
     """Check if URL is a playlist URL."""
-    return "list=" in url
+    _, query_keys = split_url(url)
+    return "list" in query_keys
 
 
 def validate_youtube_url(url: str) -> Dict[str, bool]:
-    """Validate YouTube URL and determine type."""
+    """Validate YouTube URL and determine type, a fresh dict per call on top of the cached split_url."""
     return {
         "is_valid": is_youtube_url(url),
         "is_playlist": is_playlist_url(url)
@@ -225,7 +447,7 @@ async def download_playlist_videos_parallel(
     output_path: str,
     resolution: Optional[str] = None,
     max_workers: int = 3,
-    progress_callback: Callable = on_progress
+    progress_callback: Optional[Callable] = None
 ) -> List[Dict[str, Any]]:
     """Async alias for playlist video downloads."""
     print(f"Starting async download with max {max_workers} concurrent downloads...")
@@ -236,7 +458,7 @@ async def download_playlist_audios_parallel(
     url: str,
     output_path: str,
     max_workers: int = 3,
-    progress_callback: Callable = on_progress
+    progress_callback: Optional[Callable] = None
 ) -> List[Dict[str, Any]]:
     """Async alias for playlist audio downloads."""
     print(f"Starting async audio download with max {max_workers} concurrent downloads...")
@@ -1,8 +1,19 @@
 import argparse
-from .media_format import all_formats
-from .config import config
+import sys
+from functools import cache
+from .media_format import all_format_aliases, hw_encoder_backends
+from .config import get_config
 
-def command_manager():
+def command_manager(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    # Only the invoked command needs its parser, --help and unknown verbs get both
+    command = argv[0] if argv and argv[0] in ("download", "convert") else None
+    return _build_parser(command).parse_args(argv)
+
+
+@cache
+def _build_parser(command=None):
     epilog_text = """
     Other:
         download --help     Show available command for download
@@ -26,7 +37,7 @@ def command_manager():
     )
     
     # Add version argument
-    version = config.get("application.version", "0.1.0a1")
+    version = get_config().get("application.version", "0.1.0a1")
     parser.add_argument(
         "--version", "-v",
         action="version",
@@ -37,10 +48,12 @@ def command_manager():
     subparsers = parser.add_subparsers(
         dest="command", required=True, help="Available commands"
     )
-    __download_command(subparsers)
-    __convert_command(subparsers)
+    if command != "convert":
+        __download_command(subparsers)
+    if command != "download":
+        __convert_command(subparsers)
 
-    return parser.parse_args()
+    return parser
 
 
 def __download_command(subparsers):
@@ -93,7 +106,7 @@ def __convert_command(subparsers):
         "--to",
         "-t",
         required=True,
-        choices=list(map(lambda f: f["alias"], all_formats)),
+        choices=all_format_aliases,
         help="Target format to convert to",
     )
     convert_parser.add_argument(
@@ -106,3 +119,18 @@ def __convert_command(subparsers):
         type=int,
         help="(Optional) Number of parallel conversions for batch operations (default: from config)"
     )
+    convert_parser.add_argument(
+        "--hwaccel",
+        choices=["auto", "none"] + hw_encoder_backends,
+        help="(Optional) Hardware video encoder to use when available (default: from config)"
+    )
+    convert_parser.add_argument(
+        "--preset",
+        choices=["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow", "slower", "veryslow"],
+        help="(Optional) Video encoding speed preset for software encoding (default: from config)"
+    )
+    convert_parser.add_argument(
+        "--quality",
+        type=int,
+        help="(Optional) Video constant rate factor, lower means better quality (e.g. 18-28)"
+    )
@@ -1,5 +1,7 @@
 import os
 import sys
+import warnings
+from functools import cache
 from typing import Dict, Any, Optional
 from pathlib import Path
 
@@ -18,25 +20,36 @@ except ImportError:
     YAML_AVAILABLE = False
 
 
+# Markers for Config.get's cache, a path not looked up yet and a path absent from the config
+_UNRESOLVED = object()
+_MISSING = object()
+
+# Config file names in priority order, TOML before YAML
+CONFIG_FILE_NAMES = ('config.toml', 'mmcli.toml', 'config.yaml', 'mmcli.yaml')
+
+# Most ffmpeg processes started by the automatic conversion.max_workers of 0,
+# each process already spreads its encode over every core with -threads 0
+AUTO_CONVERSION_WORKERS_MAX = 4
+
+
 class ConfigurationError(Exception):
     """Configuration related errors."""
     pass
 
 
 class Config:
-    """Configuration manager for MMCLI."""
-    
-    _instance = None
-    _config_data = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    """Configuration manager for MMCLI, use get_config() for the shared instance."""
     
     def __init__(self):
+        self._config_data: Optional[Dict[str, Any]] = None
+        self._value_cache: Dict[str, Any] = {}
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Configuration data, the config file is searched and loaded on first access."""
         if self._config_data is None:
             self._config_data = self._load_config()
+        return self._config_data
     
     def _find_config_file(self) -> Optional[Path]:
         """Find configuration file in project directory."""
@@ -55,11 +68,19 @@ class Config:
             search_paths.append(main_module_path)
         
         for search_dir in search_paths:
+            # One directory listing instead of a stat per candidate name
+            try:
+                with os.scandir(search_dir) as entries:
+                    found = {
+                        entry.name for entry in entries
+                        if entry.name in CONFIG_FILE_NAMES and entry.is_file()
+                    }
+            except OSError:
+                continue
             # Check for TOML first, then YAML
-            for config_name in ['config.toml', 'mmcli.toml', 'config.yaml', 'mmcli.yaml']:
-                config_path = search_dir / config_name
-                if config_path.exists():
-                    return config_path
+            for config_name in CONFIG_FILE_NAMES:
+                if config_name in found:
+                    return search_dir / config_name
         
         return None
     
@@ -71,8 +92,7 @@ class Config:
             )
         
         try:
-            with open(config_path, 'rb') as f:
-                return tomllib.load(f)
+            return tomllib.loads(config_path.read_bytes().decode('utf-8'))
         except Exception as e:
             raise ConfigurationError(f"Failed to load TOML config from {config_path}: {e}")
     
@@ -84,8 +104,8 @@ class Config:
             )
         
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f) or {}
+            # Parse from one in-memory read, a stream is consumed in small chunks
+            return yaml.safe_load(config_path.read_text(encoding='utf-8')) or {}
         except Exception as e:
             raise ConfigurationError(f"Failed to load YAML config from {config_path}: {e}")
     
@@ -108,16 +128,14 @@ class Config:
         return self._merge_config(defaults, config_data)
     
     def _merge_config(self, defaults: Dict[str, Any], user_config: Dict[str, Any]) -> Dict[str, Any]:
-        """Merge user configuration with defaults."""
-        result = defaults.copy()
-        
+        """Merge user configuration into defaults in place, defaults must be a freshly built dict."""
         for key, value in user_config.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._merge_config(result[key], value)
+            if isinstance(value, dict) and isinstance(defaults.get(key), dict):
+                self._merge_config(defaults[key], value)
             else:
-                result[key] = value
+                defaults[key] = value
         
-        return result
+        return defaults
     
     def _get_default_config(self) -> Dict[str, Any]:
         """Get default configuration values."""
@@ -133,15 +151,20 @@ class Config:
                 },
                 "playlist": {
                     "max_workers": 3,
+                    "audio_max_workers": 8,
                     "create_subfolders": True,
                     "batch_convert": True
                 }
             },
             "conversion": {
                 "output_dir": "converter",
+                "max_workers": 0,
+                "files_per_process": 8,
                 "video": {
                     "preserve_quality": True,
-                    "default_codec": "libx264"
+                    "default_codec": "libx264",
+                    "hwaccel": "none",
+                    "preset": "veryfast"
                 },
                 "audio": {
                     "preserve_quality": True,
@@ -170,27 +193,30 @@ class Config:
             config.get('downloads.video.format')  # Returns 'mp4'
             config.get('downloads.playlist.max_workers')  # Returns 3
         """
-        keys = key_path.split('.')
-        current = self._config_data
-        
-        try:
-            for key in keys:
-                current = current[key]
-            return current
-        except (KeyError, TypeError):
-            return default
+        # Resolved paths are memoized, misses too, getters are called on every CLI request
+        current = self._value_cache.get(key_path, _UNRESOLVED)
+        if current is _UNRESOLVED:
+            current = self.data
+            try:
+                for key in key_path.split('.'):
+                    current = current[key]
+            except (KeyError, TypeError):
+                current = _MISSING
+            self._value_cache[key_path] = current
+
+        return default if current is _MISSING else current
     
     def get_downloads_config(self) -> Dict[str, Any]:
         """Get downloads configuration section."""
-        return self._config_data.get("downloads", {})
+        return self.data.get("downloads", {})
     
     def get_conversion_config(self) -> Dict[str, Any]:
         """Get conversion configuration section."""
-        return self._config_data.get("conversion", {})
+        return self.data.get("conversion", {})
     
     def get_general_config(self) -> Dict[str, Any]:
         """Get general configuration section."""
-        return self._config_data.get("general", {})
+        return self.data.get("general", {})
     
     def get_video_defaults(self) -> Dict[str, Any]:
         """Get default video settings."""
@@ -207,53 +233,98 @@ class Config:
     def reload(self) -> None:
         """Reload configuration from file."""
         self._config_data = self._load_config()
+        self._value_cache = {}
+
+
+@cache
+def get_config() -> Config:
+    """Get the shared configuration instance, created on first call."""
+    return Config()
 
 
-# Global configuration instance
-config = Config()
+def __getattr__(name):
+    # Deprecated alias for the shared instance, resolved lazily so importing stays free of config work
+    if name != "config":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    warnings.warn("app.utils.config.config is deprecated, use get_config()", DeprecationWarning, stacklevel=2)
+    return get_config()
 
 
 # Convenience functions
 def get_config_value(key_path: str, default: Any = None) -> Any:
     """Get configuration value using dot notation."""
-    return config.get(key_path, default)
+    return get_config().get(key_path, default)
 
 
 def get_video_format_default() -> str:
     """Get default video format from config."""
-    return config.get('downloads.video.format', 'mp4')
+    return get_config().get('downloads.video.format', 'mp4')
 
 
 def get_audio_format_default() -> str:
     """Get default audio format from config."""
-    return config.get('downloads.audio.format', 'm4a')
+    return get_config().get('downloads.audio.format', 'm4a')
 
 
 def get_video_resolution_default() -> str:
     """Get default video resolution from config."""
-    return config.get('downloads.video.resolution', 'highest')
+    return get_config().get('downloads.video.resolution', 'highest')
 
 
 def get_output_dir_default() -> str:
     """Get default output directory from config."""
-    return config.get('downloads.output_dir', 'downloads')
+    return get_config().get('downloads.output_dir', 'downloads')
 
 
 def get_conversion_output_dir_default() -> str:
     """Get default conversion output directory from config."""
-    return config.get('conversion.output_dir', 'converter')
+    return get_config().get('conversion.output_dir', 'converter')
+
+
+def get_hwaccel_default() -> str:
+    """Get default hardware encoder backend for video conversion."""
+    return get_config().get('conversion.video.hwaccel', 'none')
+
+
+def get_video_preset_default() -> str:
+    """Get default x264 encoder preset for video conversion."""
+    return get_config().get('conversion.video.preset', 'veryfast')
 
 
 def get_max_workers_default() -> int:
     """Get default max workers for parallel downloads."""
-    return config.get('downloads.playlist.max_workers', 3)
+    return get_config().get('downloads.playlist.max_workers', 3)
+
+
+def get_audio_max_workers_default() -> int:
+    """Get default max workers for audio playlist downloads, small streams favor more parallelism."""
+    return get_config().get('downloads.playlist.audio_max_workers', 8)
+
+
+def get_conversion_max_workers_default() -> int:
+    """Get default number of parallel ffmpeg processes, 0 means half the CPU cores up to a cap."""
+    max_workers = get_config().get('conversion.max_workers', 0)
+    if max_workers:
+        return max_workers
+    return max(1, min(AUTO_CONVERSION_WORKERS_MAX, (os.cpu_count() or 1) // 2))
+
+
+def get_files_per_process_default() -> int:
+    """Get number of image/audio files converted by a single ffmpeg process."""
+    return get_config().get('conversion.files_per_process', 8)
+
+
+def get_max_retries_default() -> int:
+    """Get number of retries for transient failures."""
+    return get_config().get('general.max_retries', 3)
 
 
 def should_create_playlist_subfolders() -> bool:
     """Check if playlist subfolders should be created."""
-    return config.get('downloads.playlist.create_subfolders', True)
+    return get_config().get('downloads.playlist.create_subfolders', True)
 
 
 def should_use_batch_convert() -> bool:
     """Check if batch conversion should be used for playlists."""
-    return config.get('downloads.playlist.batch_convert', True)
\ No newline at end of file
+    return get_config().get('downloads.playlist.batch_convert', True)
\ No newline at end of file
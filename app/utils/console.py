@@ -0,0 +1,9 @@
+import sys
+from typing import List
+
+
+def write_status_lines(lines: List[str]) -> None:
+    """Write status lines with a single stdout write so concurrent updates never interleave."""
+    if lines:
+        sys.stdout.write("".join(f"{line}\n" for line in lines))
+        sys.stdout.flush()
@@ -1,3 +1,5 @@
+from itertools import chain
+
 video_formats = [
     {"alias": "mp4", "format": "mp4", "desc": "MPEG-4 Part 14"},
     {"alias": "mkv", "format": "matroska", "desc": "Matroska Multimedia Container"},
@@ -64,10 +66,66 @@ subtitle_formats = [
     {"alias": "mks", "format": "matroska", "desc": "Matroska Subtitles"},
 ]
 
-all_formats = video_formats + audio_formats + image_formats + subtitle_formats
+# Immutable, so the get_format index built from it below can never go stale
+all_formats = tuple(chain(video_formats, audio_formats, image_formats, subtitle_formats))
+
+# Every supported target alias, in table order for CLI choices and help
+all_format_aliases = tuple(f["alias"] for f in all_formats)
+
+# Hardware encoder backends, in the order they are tried by "auto"; vaapi is left
+# out since it needs a device and hwupload filter on top of the encoder name
+hw_encoder_backends = ["nvenc", "qsv", "videotoolbox"]
+
+# Video codec family a hardware encoder should produce for each container alias
+hw_codec_families = {
+    "mp4": "h264",
+    "mkv": "h264",
+    "mov": "h264",
+    "flv": "h264",
+    "ts": "h264",
+    "m2ts": "h264",
+    "3gp": "h264",
+    "webm": "vp9",
+}
+
+# Containers whose default ffmpeg video encoder is libx264 (accepts preset/crf)
+preset_formats = ["mp4", "mkv", "mov"]
+
+# Extra ffmpeg output options applied for specific target aliases
+format_output_options = {
+    "mp4": {"movflags": "+faststart"},
+    "mov": {"movflags": "+faststart"},
+    "m4a": {"movflags": "+faststart"},
+}
+
+
+def get_format(format: str, formats: tuple | list = all_formats) -> list:
+    if formats is all_formats:
+        return list(_all_formats_entry_index.get(format, ()))
+    return [f for f in formats if f["alias"] == format or f["format"] == format]
+
+
+def build_format_index(formats: list) -> dict:
+    """Map aliases and ffmpeg format names to the alias get_format would return first."""
+    index = {}
+    for fmt in formats:
+        index.setdefault(fmt["alias"], fmt["alias"])
+        index.setdefault(fmt["format"], fmt["alias"])
+    return index
+
+
+def build_format_entry_index(formats: list) -> dict:
+    """Map aliases and ffmpeg format names to their matching entries, in list order."""
+    index = {}
+    for fmt in formats:
+        for key in {fmt["alias"], fmt["format"]}:
+            index.setdefault(key, []).append(fmt)
+    return index
+
 
+# Built once at import, download format lookups are O(1) dict hits
+video_format_index = build_format_index(video_formats)
+audio_format_index = build_format_index(audio_formats)
 
-def get_format(format: str, formats: list = all_formats) -> list:
-    return list(
-        filter(lambda f: f["alias"] == format or f["format"] == format, formats)
-    )
+# get_format index for the immutable all_formats, the mutable category lists are scanned
+_all_formats_entry_index = build_format_entry_index(all_formats)
@@ -1,10 +1,31 @@
 import asyncio
-from app import download, convert, command_manager
+from app import command_manager
 
 
-async def _async_main():
+# Each subcommand imports its own stack on use, e.g. `convert` never loads pytubefix
+async def download(args):
+    """Run the download command."""
+    from app.tools.media_downloader import download as run_download
+    return await run_download(args)
+
+
+async def convert(args):
+    """Run the convert command."""
+    from app.tools.media_converter import convert as run_convert
+    return await run_convert(args)
+
+
+def _get_event_loop_runner():
+    """Get uvloop's runner when installed, imported only once a command actually runs."""
+    try:
+        import uvloop  # libuv event loop, cheaper scheduling for parallel ffmpeg/download tasks
+    except ImportError:
+        return asyncio.run
+    return uvloop.run
+
+
+async def _async_main(args):
     """Internal async main function."""
-    args = command_manager()
     if args.command == "download":
         await download(args)
     elif args.command == "convert":
@@ -17,7 +38,9 @@ async def _async_main():
 def main():
     """Main entry point for CLI that handles the async main function."""
     try:
-        asyncio.run(_async_main())
+        # Parsed before the loop starts, so --help and usage errors skip the uvloop import
+        args = command_manager()
+        _get_event_loop_runner()(_async_main(args))
     except KeyboardInterrupt:
         print("\nOperation cancelled by user")
     except Exception as e:
@@ -0,0 +1,22 @@
+import pytest
+from types import SimpleNamespace
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_imports():
+    """Import the app modules and load config once per session"""
+    import main
+    import app.tools.media_converter
+    import app.tools.media_downloader
+    import app.tools.youtube_downloader
+    from app.utils.config import get_config
+
+    get_config().data
+
+
+@pytest.fixture
+def make_args():
+    """Build parsed CLI args as a plain namespace, unset options default to None"""
+    def _make_args(**kwargs):
+        return SimpleNamespace(**{"url": None, "format": None, "type": None, "resolution": None, **kwargs})
+    return _make_args
@@ -1,80 +1,61 @@
-import pytest
-import subprocess
-import tempfile
-import shutil
+import asyncio
 import sys
-from pathlib import Path
-from unittest.mock import patch, MagicMock
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock, DEFAULT
 import main
+from app.utils.command_manager import command_manager
 
 
-class TestIntegration:
-    def setup_method(self):
-        """Set up test fixtures"""
-        self.temp_dir = Path(tempfile.mkdtemp())
-        self.test_file = self.temp_dir / "test.jpg"
-        # Create a simple test file
-        self.test_file.write_bytes(b'\xff\xd8\xff\xe0' + b'\x00' * 100)  # Minimal JPEG header
+@pytest.fixture(scope="session")
+def test_jpeg(tmp_path_factory):
+    """Minimal JPEG file shared by the tests that read it"""
+    path = tmp_path_factory.mktemp("integration") / "test.jpg"
+    path.write_bytes(b'\xff\xd8\xff\xe0' + b'\x00' * 100)  # Minimal JPEG header
+    return path
 
-    def teardown_method(self):
-        """Clean up test fixtures"""
-        if self.temp_dir.exists():
-            shutil.rmtree(self.temp_dir)
 
-    @patch('main.download')
-    @patch('main.command_manager')
-    def test_main_download_video_command(self, mock_command_manager, mock_download):
+class TestIntegration:
+    @patch.multiple('main', download=DEFAULT, command_manager=DEFAULT)
+    def test_main_download_video_command(self, **mocks):
         """Test main function with download video command"""
-        mock_args = MagicMock()
-        mock_args.command = "download"
-        mock_args.type = "video"
-        mock_args.url = "https://youtube.com/watch?v=test"
-        mock_command_manager.return_value = mock_args
-        mock_download.return_value = {"success": True}
+        mock_args = SimpleNamespace(command="download", type="video", url="https://youtube.com/watch?v=test")
+        mocks["command_manager"].return_value = mock_args
+        mocks["download"].return_value = {"success": True}
 
         main.main()
 
-        mock_command_manager.assert_called_once()
-        mock_download.assert_called_once_with(mock_args)
+        mocks["command_manager"].assert_called_once()
+        mocks["download"].assert_called_once_with(mock_args)
 
-    @patch('main.download')
-    @patch('main.command_manager')
-    def test_main_download_audio_command(self, mock_command_manager, mock_download):
+    @patch.multiple('main', download=DEFAULT, command_manager=DEFAULT)
+    def test_main_download_audio_command(self, **mocks):
         """Test main function with download audio command"""
-        mock_args = MagicMock()
-        mock_args.command = "download"
-        mock_args.type = "audio"
-        mock_args.url = "https://youtube.com/watch?v=test"
-        mock_command_manager.return_value = mock_args
-        mock_download.return_value = {"success": True}
+        mock_args = SimpleNamespace(command="download", type="audio", url="https://youtube.com/watch?v=test")
+        mocks["command_manager"].return_value = mock_args
+        mocks["download"].return_value = {"success": True}
 
         main.main()
 
-        mock_command_manager.assert_called_once()
-        mock_download.assert_called_once_with(mock_args)
+        mocks["command_manager"].assert_called_once()
+        mocks["download"].assert_called_once_with(mock_args)
 
-    @patch('main.convert')
-    @patch('main.command_manager')
-    def test_main_convert_command(self, mock_command_manager, mock_convert):
+    @patch.multiple('main', convert=DEFAULT, command_manager=DEFAULT)
+    def test_main_convert_command(self, **mocks):
         """Test main function with convert command"""
-        mock_args = MagicMock()
-        mock_args.command = "convert"
-        mock_args.path = "test.jpg"
-        mock_args.to = "png"
-        mock_command_manager.return_value = mock_args
+        mock_args = SimpleNamespace(command="convert", path="test.jpg", to="png")
+        mocks["command_manager"].return_value = mock_args
 
         main.main()
 
-        mock_command_manager.assert_called_once()
-        mock_convert.assert_called_once_with(mock_args)
+        mocks["command_manager"].assert_called_once()
+        mocks["convert"].assert_called_once_with(mock_args)
 
     @patch('builtins.print')
     @patch('main.command_manager')
     def test_main_invalid_command(self, mock_command_manager, mock_print):
         """Test main function with invalid command"""
-        mock_args = MagicMock()
-        mock_args.command = "invalid"
-        mock_args.print_help = MagicMock()
+        mock_args = SimpleNamespace(command="invalid", print_help=MagicMock())
         mock_command_manager.return_value = mock_args
 
         main.main()
@@ -83,134 +64,60 @@ class TestIntegration:
         mock_print.assert_called_with("Command not found")
         mock_args.print_help.assert_called_once()
 
-    def test_cli_help_message(self):
-        """Test CLI help message displays correctly"""
-        try:
-            result = subprocess.run(
-                [sys.executable, "main.py", "--help"],
-                cwd=str(Path(__file__).parent.parent),
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            assert "Multimedia Helper CLI Command" in result.stdout
-            assert "download" in result.stdout
-            assert "convert" in result.stdout
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pytest.skip("CLI not available for integration testing")
-
-    def test_cli_download_help(self):
-        """Test CLI download help message"""
-        try:
-            result = subprocess.run(
-                [sys.executable, "main.py", "download", "--help"],
-                cwd=str(Path(__file__).parent.parent),
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            assert "video" in result.stdout
-            assert "audio" in result.stdout
-            # --url is only shown in video/audio subcommand help, not in download help
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pytest.skip("CLI not available for integration testing")
-
-    def test_cli_convert_help(self):
-        """Test CLI convert help message"""
-        try:
-            result = subprocess.run(
-                [sys.executable, "main.py", "convert", "--help"],
-                cwd=str(Path(__file__).parent.parent),
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            assert "--path" in result.stdout
-            assert "--to" in result.stdout
-            assert "--output_dir" in result.stdout
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pytest.skip("CLI not available for integration testing")
-
-    def test_cli_download_video_help(self):
-        """Test CLI download video help message"""
-        try:
-            result = subprocess.run(
-                [sys.executable, "main.py", "download", "video", "--help"],
-                cwd=str(Path(__file__).parent.parent),
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            assert "--url" in result.stdout
-            assert "--resolution" in result.stdout
-            assert "--format" in result.stdout
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pytest.skip("CLI not available for integration testing")
-
-    def test_cli_download_audio_help(self):
-        """Test CLI download audio help message"""
-        try:
-            result = subprocess.run(
-                [sys.executable, "main.py", "download", "audio", "--help"],
-                cwd=str(Path(__file__).parent.parent),
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            assert "--url" in result.stdout
-            assert "--format" in result.stdout
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pytest.skip("CLI not available for integration testing")
-
-    def test_cli_missing_required_args(self):
+    @pytest.mark.parametrize("argv, expected", [
+        (["--help"], ["Multimedia Helper CLI Command", "download", "convert"]),
+        (["download", "--help"], ["video", "audio"]),
+        (["convert", "--help"], ["--path", "--to", "--output_dir"]),
+        (["download", "video", "--help"], ["--url", "--resolution", "--format"]),
+        (["download", "audio", "--help"], ["--url", "--format"]),
+    ])
+    def test_cli_help(self, capsys, argv, expected):
+        """Test CLI help messages display correctly"""
+        with pytest.raises(SystemExit) as exc_info:
+            command_manager(argv=argv)
+
+        assert exc_info.value.code == 0
+        out = capsys.readouterr().out
+        for text in expected:
+            assert text in out
+
+    def test_cli_help_exits_before_event_loop_setup(self, capsys, monkeypatch):
+        """Test --help returns before the event loop runner, and uvloop, is loaded"""
+        runner = MagicMock()
+        monkeypatch.setattr("main._get_event_loop_runner", runner)
+        monkeypatch.setattr("sys.argv", ["mmcli", "--help"])
+
+        with pytest.raises(SystemExit):
+            main.main()
+        runner.assert_not_called()
+
+    def test_event_loop_runner_falls_back_to_asyncio(self, monkeypatch):
+        """Test asyncio.run is used when uvloop is not installed"""
+        monkeypatch.setitem(sys.modules, "uvloop", None)
+        assert main._get_event_loop_runner() is asyncio.run
+
+    @pytest.mark.parametrize("argv", [
+        ["download", "video"],
+        ["convert", "--to", "mp3"],
+    ])
+    def test_cli_missing_required_args(self, capsys, argv):
         """Test CLI with missing required arguments"""
-        try:
-            # Test download without URL
-            result = subprocess.run(
-                [sys.executable, "main.py", "download", "video"],
-                cwd=str(Path(__file__).parent.parent),
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            assert result.returncode != 0
-            assert "required" in result.stderr.lower() or "error" in result.stderr.lower()
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pytest.skip("CLI not available for integration testing")
+        with pytest.raises(SystemExit) as exc_info:
+            command_manager(argv=argv)
 
-    def test_cli_convert_missing_args(self):
-        """Test CLI convert with missing arguments"""
-        try:
-            # Test convert without path
-            result = subprocess.run(
-                [sys.executable, "main.py", "convert", "--to", "mp3"],
-                cwd=str(Path(__file__).parent.parent),
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            assert result.returncode != 0
-            assert "required" in result.stderr.lower() or "error" in result.stderr.lower()
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pytest.skip("CLI not available for integration testing")
+        assert exc_info.value.code != 0
+        assert "required" in capsys.readouterr().err.lower()
 
     @patch('app.tools.media_converter.resolve_file_paths')
     @patch('app.tools.media_converter.convert_files_functional')
-    def test_end_to_end_convert_flow(self, mock_convert_files, mock_get_files):
+    def test_end_to_end_convert_flow(self, mock_convert_files, mock_get_files, test_jpeg):
         """Test end-to-end convert flow"""
         # Mock the file operations
-        mock_get_files.return_value = [self.test_file]
+        mock_get_files.return_value = [test_jpeg]
         mock_convert_files.return_value = None
         
         # Simulate command line args
-        with patch('sys.argv', ['main.py', 'convert', '--path', str(self.test_file), '--to', 'png']):
+        with patch('sys.argv', ['main.py', 'convert', '--path', str(test_jpeg), '--to', 'png']):
             main.main()
             
         # Verify the flow
@@ -242,43 +149,33 @@ class TestIntegration:
         # Verify YouTube instance was created
         mock_create_yt.assert_called_once()
 
-    def test_format_validation_integration(self):
+    def test_format_validation_integration(self, capsys):
         """Test format validation in integration"""
-        try:
-            result = subprocess.run(
-                [sys.executable, "main.py", "convert", "--path", "test.jpg", "--to", "invalid_format"],
-                cwd=str(Path(__file__).parent.parent),
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            # Should fail with invalid format
-            assert result.returncode != 0
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pytest.skip("CLI not available for integration testing")
+        with pytest.raises(SystemExit) as exc_info:
+            command_manager(argv=["convert", "--path", "test.jpg", "--to", "invalid_format"])
+
+        # Should fail with invalid format
+        assert exc_info.value.code != 0
+        assert "invalid choice" in capsys.readouterr().err
 
-    @patch('main.convert')
-    @patch('main.download')
-    def test_command_routing(self, mock_download, mock_convert):
+    @patch.multiple('main', download=DEFAULT, convert=DEFAULT)
+    def test_command_routing(self, **mocks):
         """Test command routing logic"""
         # Test download routing
-        mock_download_args = MagicMock()
-        mock_download_args.command = "download"
-        mock_download.return_value = {"success": True}
+        mock_download_args = SimpleNamespace(command="download")
+        mocks["download"].return_value = {"success": True}
         
         with patch('main.command_manager', return_value=mock_download_args):
             main.main()
-        mock_download.assert_called_once_with(mock_download_args)
+        mocks["download"].assert_called_once_with(mock_download_args)
         
         # Reset mocks for second test
-        mock_download.reset_mock()
-        mock_convert.reset_mock()
+        mocks["download"].reset_mock()
+        mocks["convert"].reset_mock()
         
         # Test convert routing
-        mock_convert_args = MagicMock()
-        mock_convert_args.command = "convert"
+        mock_convert_args = SimpleNamespace(command="convert")
         
         with patch('main.command_manager', return_value=mock_convert_args):
             main.main()
-        mock_convert.assert_called_once_with(mock_convert_args)
\ No newline at end of file
+        mocks["convert"].assert_called_once_with(mock_convert_args)
\ No newline at end of file
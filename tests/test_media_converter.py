@@ -1,57 +1,84 @@
+import asyncio
+import threading
 import pytest
-import tempfile
-import shutil
 from pathlib import Path
-from unittest.mock import patch, MagicMock, call
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock, AsyncMock, call
 from app.tools.media_converter import (
     resolve_file_paths,
     ensure_output_directory,
     create_output_path,
     find_ffmpeg_format,
+    encoder_works,
+    select_video_encoder,
+    create_output_options,
+    create_conversion_job,
+    build_ffmpeg_command,
+    execute_ffmpeg_conversion,
+    run_ffmpeg_command,
     convert_single_file_functional,
     convert_files_functional,
+    process_conversion_batch,
+    run_worker_pool,
+    print_conversion_results,
+    validate_conversion_args,
     convert,
 )
 
 
 class TestMediaConverter:
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_files(self, tmp_path):
         """Set up test fixtures"""
-        self.temp_dir = Path(tempfile.mkdtemp())
+        self.temp_dir = tmp_path
         self.test_file = self.temp_dir / "test.mp4"
         self.test_file.touch()
 
-    def teardown_method(self):
-        """Clean up test fixtures"""
-        if self.temp_dir.exists():
-            shutil.rmtree(self.temp_dir)
+    @pytest.fixture(autouse=True)
+    def mock_ffmpeg(self, monkeypatch):
+        """Stub the ffmpeg process spawn, succeeding by default"""
+        self.ffmpeg_process = MagicMock(returncode=0)
+        self.ffmpeg_process.communicate = AsyncMock(return_value=(b"", b""))
+        self.mock_exec = AsyncMock(return_value=self.ffmpeg_process)
+        monkeypatch.setattr("asyncio.create_subprocess_exec", self.mock_exec)
 
-    def test_get_files_single_file(self):
+    @patch('app.tools.media_converter.os.path.exists', return_value=True)
+    def test_get_files_single_file(self, mock_exists):
         """Test getting single file"""
-        files = resolve_file_paths(str(self.test_file))
-        assert len(files) == 1
-        assert files[0] == self.test_file
+        files = resolve_file_paths("/fake/test.mp4")
+        assert files == [Path("/fake/test.mp4")]
+        mock_exists.assert_called_once_with("/fake/test.mp4")
 
     def test_get_files_nonexistent_file(self):
         """Test error handling for nonexistent file"""
         with pytest.raises(FileNotFoundError):
             resolve_file_paths("nonexistent.mp4")
 
-    @patch('app.tools.media_converter.glob')
-    def test_get_files_glob_pattern(self, mock_glob):
+    @patch('app.tools.media_converter.iglob')
+    def test_get_files_glob_pattern(self, mock_iglob):
         """Test getting files with glob pattern"""
-        mock_glob.return_value = [str(self.test_file)]
+        mock_iglob.return_value = iter(["/fake/test.mp4"])
         files = resolve_file_paths("*.mp4")
-        assert len(files) == 1
-        assert str(files[0]) == str(self.test_file)
+        assert files == [Path("/fake/test.mp4")]
 
-    @patch('glob.glob')
-    def test_get_files_glob_pattern_no_matches(self, mock_glob):
+    @patch('app.tools.media_converter.iglob')
+    def test_get_files_glob_pattern_no_matches(self, mock_iglob):
         """Test glob pattern with no matches"""
-        mock_glob.return_value = []
+        mock_iglob.return_value = iter([])
         with pytest.raises(FileNotFoundError):
             resolve_file_paths("*.nonexistent")
 
+    def test_get_files_recursive_fallback(self, monkeypatch):
+        """Test glob pattern falls back to recursive search"""
+        nested_dir = self.temp_dir / "nested"
+        nested_dir.mkdir()
+        nested_file = nested_dir / "clip.mkv"
+        nested_file.touch()
+        monkeypatch.chdir(self.temp_dir)
+
+        files = resolve_file_paths("*.mkv")
+        assert files == [Path("nested") / "clip.mkv"]
+
     def test_resolve_output_dir_default(self):
         """Test resolve output directory with default"""
         output_dir = ensure_output_directory(None)
@@ -76,7 +103,12 @@ class TestMediaConverter:
         assert output_path.parent == output_dir
         assert output_path.suffix == ".mp3"
         assert "test_" in output_path.name
-        assert len(output_path.stem.split('_')) >= 3  # test_YYYYMMDD_HHMMSS...
+        assert len(output_path.stem.split('_')) == 3  # test_<time_ns>_<sequence>
+
+    def test_build_output_path_unique(self):
+        """Test output paths stay unique within the same instant"""
+        paths = {create_output_path(Path("test.mp4"), "mp3", self.temp_dir) for _ in range(100)}
+        assert len(paths) == 100
 
     def test_get_ffmpeg_format_valid(self):
         """Test getting valid ffmpeg format"""
@@ -88,52 +120,167 @@ class TestMediaConverter:
         result = find_ffmpeg_format("invalid_format")
         assert result is None
 
-    @patch('ffmpeg.input')
-    @pytest.mark.asyncio
-    async def test_convert_single_file_success(self, mock_input):
-        """Test successful single file conversion"""
-        mock_stream = MagicMock()
-        mock_output_stream = MagicMock()
-        mock_input.return_value = mock_stream
-        mock_stream.output.return_value = mock_output_stream
-        mock_output_stream.run = MagicMock()
+    @patch('app.tools.media_converter.encoder_works', return_value=True)
+    @patch('app.tools.media_converter.detect_available_encoders')
+    def test_select_video_encoder_auto(self, mock_detect, mock_works):
+        """Test hardware encoder auto selection picks first available backend"""
+        mock_detect.return_value = frozenset({"h264_qsv", "h264_videotoolbox"})
+        assert select_video_encoder("mp4", "auto") == "h264_qsv"
+        assert select_video_encoder("webm", "auto") is None
+
+    @patch('app.tools.media_converter.encoder_works', side_effect=lambda encoder: encoder != "h264_nvenc")
+    @patch('app.tools.media_converter.detect_available_encoders')
+    def test_select_video_encoder_skips_encoders_without_hardware(self, mock_detect, mock_works):
+        """Test compiled in encoders failing the test encode are skipped"""
+        mock_detect.return_value = frozenset({"h264_nvenc", "h264_qsv"})
+        assert select_video_encoder("mp4", "auto") == "h264_qsv"
+        assert select_video_encoder("mp4", "nvenc") is None
+
+    @pytest.mark.parametrize("returncode, expected", [(0, True), (1, False)])
+    @patch('app.tools.media_converter.subprocess.run')
+    def test_encoder_works(self, mock_run, returncode, expected):
+        """Test encoder probe runs one test encode per encoder and caches the outcome"""
+        encoder_works.cache_clear()
+        mock_run.return_value = MagicMock(returncode=returncode)
+
+        assert encoder_works("h264_nvenc") is expected
+        assert encoder_works("h264_nvenc") is expected
+        mock_run.assert_called_once()
+        assert "h264_nvenc" in mock_run.call_args[0][0]
+        encoder_works.cache_clear()
 
-        result = await convert_single_file_functional(self.test_file, "mp3", self.temp_dir)
+    @patch('app.tools.media_converter.encoder_works', return_value=True)
+    @patch('app.tools.media_converter.detect_available_encoders')
+    def test_select_video_encoder_disabled_or_non_video(self, mock_detect, mock_works):
+        """Test no hardware encoder for 'none' or non-video targets"""
+        mock_detect.return_value = frozenset({"h264_nvenc"})
+        assert select_video_encoder("mp4", "none") is None
+        assert select_video_encoder("mp3", "auto") is None
+        assert select_video_encoder("mp4", "nvenc") == "h264_nvenc"
+
+    @patch('app.tools.media_converter.encoder_works', return_value=True)
+    @patch('app.tools.media_converter.detect_available_encoders')
+    def test_create_output_options(self, mock_detect, mock_works):
+        """Test output options for software and hardware video encoding"""
+        mock_detect.return_value = frozenset({"h264_nvenc"})
+
+        software = create_output_options("mp4", "none", "veryfast", 23)
+        assert software == {"threads": 0, "movflags": "+faststart", "preset": "veryfast", "crf": 23}
+
+        hardware = create_output_options("mp4", "nvenc", "veryfast", 23)
+        assert hardware["vcodec"] == "h264_nvenc"
+        assert "preset" not in hardware and "crf" not in hardware
+
+        assert create_output_options("png", "auto", "veryfast") == {"threads": 0}
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_convert_single_file_success(self):
+        """Test successful single file conversion"""
+        result = await convert_single_file_functional(self.test_file, "mp3", "mp3", self.temp_dir)
         
         assert result["success"] is True
-        mock_input.assert_called_once()
-        mock_stream.output.assert_called_once()
-        mock_output_stream.run.assert_called_once()
-
-    @patch('ffmpeg.input')
-    @pytest.mark.asyncio
-    async def test_convert_single_file_invalid_format(self, mock_input):
-        """Test single file conversion with invalid format"""
-        result = await convert_single_file_functional(self.test_file, "invalid_format", self.temp_dir)
-        assert result["success"] is False
-        mock_input.assert_not_called()
+        command = self.mock_exec.call_args[0]
+        assert command[command.index("-i") + 1] == str(self.test_file)
+        assert command[command.index("-f") + 1] == "mp3"
+        assert command[-1] == result["output_file"]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_convert_files_invalid_format(self):
+        """Test batch conversion rejects invalid format before starting ffmpeg"""
+        with pytest.raises(ValueError, match="Unsupported format: invalid_format"):
+            await convert_files_functional([self.test_file], "invalid_format", str(self.temp_dir))
+        self.mock_exec.assert_not_called()
 
-    @patch('ffmpeg.input')
-    @pytest.mark.asyncio
-    async def test_convert_single_file_ffmpeg_error(self, mock_input):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_convert_single_file_ffmpeg_error(self):
         """Test single file conversion with ffmpeg error"""
-        mock_stream = MagicMock()
-        mock_output_stream = MagicMock()
-        mock_input.return_value = mock_stream
-        mock_stream.output.return_value = mock_output_stream
-        mock_output_stream.run.side_effect = Exception("FFmpeg error")
+        self.ffmpeg_process.returncode = 1
+        self.ffmpeg_process.communicate.return_value = (b"", b"FFmpeg error")
 
-        result = await convert_single_file_functional(self.test_file, "mp3", self.temp_dir)
+        result = await convert_single_file_functional(self.test_file, "mp3", "mp3", self.temp_dir)
         assert result["success"] is False
 
-    @patch('app.tools.media_converter.convert_single_file_functional')
+    def test_build_ffmpeg_command_output_options(self):
+        """Test output options are passed as ffmpeg flags"""
+        job = create_conversion_job(self.test_file, "mkv", "matroska", self.temp_dir, {"threads": 0, "crf": 23})
+        command = build_ffmpeg_command(job)
+        assert command[command.index("-crf") + 1] == "23"
+        assert command[command.index("-f") + 1] == "matroska"
+        assert command[-1] == str(job.output_path)
+
+    def test_build_ffmpeg_command_same_format_stream_copy(self):
+        """Test same container conversion remuxes instead of re-encoding"""
+        options = {"threads": 0, "movflags": "+faststart", "preset": "veryfast", "crf": 23}
+        job = create_conversion_job(self.test_file, "mp4", "mp4", self.temp_dir, options)
+        command = build_ffmpeg_command(job)
+        assert job.stream_copy is True
+        assert command[command.index("-c") + 1] == "copy"
+        assert "-crf" not in command and "-preset" not in command
+        assert "-movflags" in command
+
+        assert create_conversion_job(self.test_file, "mkv", "matroska", self.temp_dir).stream_copy is False
+
+    @pytest.mark.parametrize("quality, preset, stream_copy", [
+        (None, None, True),
+        (23, None, False),
+        (None, "slow", False),
+    ])
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_convert_same_format_explicit_encoder_options_reencode(self, quality, preset, stream_copy):
+        """Test an explicit --quality or --preset re-encodes instead of a stream copy dropping it"""
+        args = SimpleNamespace(
+            path=str(self.test_file), to="mp4", output_dir=str(self.temp_dir),
+            max_workers=1, hwaccel="none", preset=preset, quality=quality
+        )
+
+        await convert(args)
+
+        command = self.mock_exec.call_args[0]
+        assert ("copy" in command) is stream_copy
+        if quality is not None:
+            assert command[command.index("-crf") + 1] == str(quality)
+        if preset is not None:
+            assert command[command.index("-preset") + 1] == preset
+
+    @pytest.mark.parametrize("source, target", [("clip.mp4", "mov"), ("clip.webm", "mkv")])
+    @pytest.mark.parametrize("quality, preset", [(23, None), (None, "slow")])
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_convert_remux_pair_explicit_encoder_options_reencode(self, source, target, quality, preset):
+        """Test remux pairs re-encode too when --quality or --preset is given"""
+        input_file = self.temp_dir / source
+        input_file.touch()
+        args = SimpleNamespace(
+            path=str(input_file), to=target, output_dir=str(self.temp_dir),
+            max_workers=1, hwaccel="none", preset=preset, quality=quality
+        )
+        assert create_conversion_job(input_file, target, target, self.temp_dir).stream_copy is True
+
+        await convert(args)
+
+        assert "copy" not in self.mock_exec.call_args[0]
+
+    @patch('app.tools.media_converter.run_ffmpeg_command')
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_remux_falls_back_to_encoding(self, mock_run):
+        """Test compatible containers are remuxed first and re-encoded if the copy fails"""
+        webm_file = self.temp_dir / "audio.webm"
+        job = create_conversion_job(webm_file, "opus", "ogg", self.temp_dir)
+        assert job.stream_copy is True
+        mock_run.side_effect = [False, True]
+
+        assert await execute_ffmpeg_conversion(job) is True
+
+        copy_command, encode_command = (c[0][0] for c in mock_run.call_args_list)
+        assert "copy" in copy_command and "copy" not in encode_command
+        assert mock_run.call_args_list[0].kwargs["report_errors"] is False
+
+    @patch('app.tools.media_converter.convert_single_file_functional', new_callable=AsyncMock)
     @patch('app.tools.media_converter.ensure_output_directory')
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_convert_files(self, mock_resolve_dir, mock_convert_single):
         """Test batch file conversion"""
         mock_resolve_dir.return_value = self.temp_dir
-        from unittest.mock import AsyncMock
-        mock_convert_single.side_effect = AsyncMock(return_value={"success": True, "input_file": str(self.test_file), "output_file": "output.mp3", "format": "mp3"})
+        mock_convert_single.return_value = {"success": True, "input_file": str(self.test_file), "output_file": "output.mp3", "format": "mp3"}
         
         files = [self.test_file]
         result = await convert_files_functional(files, "mp3", str(self.temp_dir))
@@ -143,9 +290,73 @@ class TestMediaConverter:
         assert len(result) == 1
         assert result[0]["success"] is True
 
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_convert_files_probes_encoders_off_the_event_loop(self, monkeypatch):
+        """Test encoder selection, which may spawn ffmpeg probes, runs in a worker thread"""
+        probe_threads = []
+
+        def fake_create_output_options(*args):
+            probe_threads.append(threading.current_thread())
+            return {}
+
+        monkeypatch.setattr("app.tools.media_converter.create_output_options", fake_create_output_options)
+        await convert_files_functional([self.test_file], "mp3", str(self.temp_dir), hwaccel="auto")
+
+        assert probe_threads and probe_threads[0] is not threading.main_thread()
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_process_batch_multi_output(self):
+        """Test image files share a single ffmpeg process"""
+        files = [self.temp_dir / f"image{i}.png" for i in range(3)]
+
+        results = await process_conversion_batch(files, "jpg", "mjpeg", self.temp_dir, 2, {}, files_per_process=8)
+
+        self.mock_exec.assert_called_once()
+        command = self.mock_exec.call_args[0]
+        assert command.count("-i") == 3
+        assert "2:v:0" in command
+        assert len(results) == 3
+        assert all(result["success"] for result in results)
+
+    @patch('app.tools.media_converter.convert_single_file_functional')
+    @patch('app.tools.media_converter.execute_ffmpeg_multi_output_conversion')
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_process_batch_multi_output_fallback(self, mock_multi, mock_convert_single):
+        """Test failed grouped conversion is retried file by file"""
+        files = [self.temp_dir / f"image{i}.png" for i in range(3)]
+        mock_multi.return_value = False
+        mock_convert_single.side_effect = lambda input_file, *args: {
+            "success": True, "input_file": str(input_file), "output_file": "out.jpg", "format": "jpg"
+        }
+
+        results = await process_conversion_batch(files, "jpg", "mjpeg", self.temp_dir, 1, {}, files_per_process=2)
+
+        assert mock_multi.call_count == 2
+        assert mock_convert_single.call_count == 3
+        assert [result["input_file"] for result in results] == [str(f) for f in files]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_run_worker_pool_order_and_limit(self):
+        """Test worker pool keeps input order and bounds live workers"""
+        active = 0
+        peak = 0
+
+        async def worker(item):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.001 * (5 - item))
+            active -= 1
+            return item * 2
+
+        results = await run_worker_pool(list(range(5)), worker, 2)
+
+        assert results == [0, 2, 4, 6, 8]
+        assert peak == 2
+
     @patch('app.tools.media_converter.resolve_file_paths')
-    @patch('app.tools.media_converter.convert_files_functional')
-    @pytest.mark.asyncio
+    @patch('app.tools.media_converter.convert_files_functional', new_callable=AsyncMock)
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_convert_main_function_success(self, mock_convert_files, mock_get_files):
         """Test main convert function success"""
         mock_args = MagicMock()
@@ -154,8 +365,7 @@ class TestMediaConverter:
         mock_args.output_dir = None
         
         mock_get_files.return_value = [self.test_file]
-        from unittest.mock import AsyncMock
-        mock_convert_files.side_effect = AsyncMock(return_value=[{"success": True}])
+        mock_convert_files.return_value = [{"success": True}]
         
         await convert(mock_args)
         
@@ -166,7 +376,7 @@ class TestMediaConverter:
         assert call_args[0][:3] == ([self.test_file], "mp3", None)  # Check first 3 args, ignore max_workers
 
     @patch('app.tools.media_converter.resolve_file_paths')
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_convert_main_function_error(self, mock_get_files):
         """Test main convert function error handling"""
         mock_args = MagicMock()
@@ -180,8 +390,6 @@ class TestMediaConverter:
     @patch('builtins.print')
     def test_print_conversion_summary(self, mock_print):
         """Test conversion summary printing"""
-        from app.tools.media_converter import print_conversion_results
-        
         results = [{"success": True}, {"success": True}, {"success": False, "input_file": "test.mp4"}]
         print_conversion_results(results, "mp3", str(self.temp_dir))
         
@@ -192,4 +400,35 @@ class TestMediaConverter:
         call_args = [call[0][0] for call in mock_print.call_args_list]
         assert any("Conversion complete" in arg for arg in call_args)
         assert any("Successfully converted: 2" in arg for arg in call_args)
-        assert any("Failed to convert: 1" in arg for arg in call_args)
\ No newline at end of file
+        assert any("Failed to convert: 1" in arg for arg in call_args)
+
+    @pytest.mark.parametrize("cpu_count, expected", [(None, 1), (1, 1), (6, 3), (32, 4)])
+    @patch('app.utils.config.os.cpu_count')
+    @patch('app.utils.config.get_config')
+    def test_validate_conversion_args_default_workers_per_core(self, mock_get_config, mock_cpu_count, cpu_count, expected):
+        """Test conversions default to half the CPU cores, capped since each ffmpeg uses all cores"""
+        mock_get_config.return_value.get.side_effect = lambda key, default=None: default
+        mock_cpu_count.return_value = cpu_count
+        args = MagicMock(path="*.mp4", to="mp3", max_workers=None, hwaccel=None, preset=None)
+
+        assert validate_conversion_args(args)["max_workers"] == expected
+
+    @patch('app.tools.media_converter.get_max_retries_default', return_value=2)
+    @patch('app.tools.media_converter.asyncio.sleep', new_callable=AsyncMock)
+    @patch('app.tools.media_converter.asyncio.create_subprocess_exec')
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_run_ffmpeg_command_retries_transient_spawn_errors(self, mock_exec, mock_sleep, mock_retries):
+        """Test transient spawn failures are retried with backoff, a missing ffmpeg is not"""
+        process = MagicMock(returncode=0)
+        process.communicate = AsyncMock(return_value=(None, b""))
+        mock_exec.side_effect = [BlockingIOError("EAGAIN"), process]
+
+        assert await run_ffmpeg_command(["ffmpeg"], "test.mp4") is True
+        assert mock_exec.call_count == 2
+        mock_sleep.assert_awaited_once()
+
+        mock_exec.reset_mock()
+        mock_exec.side_effect = FileNotFoundError("ffmpeg")
+        with pytest.raises(FileNotFoundError):
+            await run_ffmpeg_command(["ffmpeg"], "test.mp4")
+        assert mock_exec.call_count == 1
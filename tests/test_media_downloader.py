@@ -1,9 +1,10 @@
+import asyncio
+import io
 import pytest
-import tempfile
-import shutil
 import os
 from pathlib import Path
-from unittest.mock import patch, MagicMock, call
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock, AsyncMock, call
 from app.tools.media_downloader import (
     get_output_dir,
     get_video_format_or_default,
@@ -19,29 +20,44 @@ from app.tools.media_downloader import (
 )
 from app.tools.youtube_downloader import (
     create_youtube_instance,
+    get_youtube,
     select_video_stream,
     select_audio_stream,
     download_stream,
+    get_http_session,
+    download_media,
+    download_single_video as yt_download_single_video,
+    LARGE_STREAM_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    on_progress,
 )
 
+EXT_CASES = (
+    ("test.mp4", "mp4"),
+    ("test.MP4", "mp4"),
+    ("path/to/file.avi", "avi"),
+    ("no_extension", ""),
+)
 
-class TestMediaDownloader:
-    def setup_method(self):
-        """Set up test fixtures"""
-        self.temp_dir = Path(tempfile.mkdtemp())
+CONVERT_CASES = (
+    ("mp4", "mp3", True),
+    ("mp4", "MP4", False),
+    ("MP4", "mp4", False),
+    ("webm", "mp4", True),
+)
+
+# Platform-specific expected paths, joined once at import
+EXPECTED_OUTPUT_DIR = os.path.join("/test/path", "downloads")
+EXPECTED_VIDEO_PATH = os.path.join("/base", "videos")
 
-    def teardown_method(self):
-        """Clean up test fixtures"""
-        if self.temp_dir.exists():
-            shutil.rmtree(self.temp_dir)
 
+class TestMediaDownloader:
     @patch('os.getcwd')
     def test_get_output_dir(self, mock_getcwd):
         """Test getting output directory"""
         mock_getcwd.return_value = "/test/path"
         result = get_output_dir()
-        expected = os.path.join("/test/path", "downloads")
-        assert result == expected
+        assert result == EXPECTED_OUTPUT_DIR
 
     def test_select_stream_by_resolution_with_resolution(self):
         """Test stream selection with specific resolution"""
@@ -72,17 +88,23 @@ class TestMediaDownloader:
         result = get_video_format_or_default(None)
         assert result == "mp4"
 
-    @patch('app.tools.media_downloader.get_format')
-    def test_get_video_format_or_default_valid(self, mock_get_format):
+    def test_get_video_format_or_default_valid(self):
         """Test video format with valid input"""
-        mock_get_format.return_value = [{"format": "mkv"}]
-        result = get_video_format_or_default("mkv")
-        assert result == "mkv"
+        assert get_video_format_or_default("mkv") == "mkv"
+        assert get_video_format_or_default("matroska") == "mkv"
+
+    @pytest.mark.parametrize("get_format_or_default, format_arg, expected", [
+        (get_video_format_or_default, "matroska", "mkv"),
+        (get_video_format_or_default, "asf", "wmv"),
+        (get_audio_format_or_default, "m4a", "m4a"),
+        (get_audio_format_or_default, "ipod", "m4a"),
+    ], ids=["mkv", "wmv", "m4a-alias", "m4a-muxer"])
+    def test_format_or_default_returns_alias_not_muxer(self, get_format_or_default, format_arg, expected):
+        """Test the alias comes back, not the ffmpeg muxer name, since it is compared to file extensions"""
+        assert get_format_or_default(format_arg) == expected
 
-    @patch('app.tools.media_downloader.get_format')
-    def test_get_video_format_or_default_invalid(self, mock_get_format):
+    def test_get_video_format_or_default_invalid(self):
         """Test video format with invalid input"""
-        mock_get_format.return_value = []
         with pytest.raises(ValueError, match="Unsupported format: invalid"):
             get_video_format_or_default("invalid")
 
@@ -91,32 +113,25 @@ class TestMediaDownloader:
         result = get_audio_format_or_default(None)
         assert result is None  # None indicates no conversion needed
 
-    @patch('app.tools.media_downloader.get_format')
-    def test_get_audio_format_or_default_valid(self, mock_get_format):
+    def test_get_audio_format_or_default_valid(self):
         """Test audio format with valid input"""
-        mock_get_format.return_value = [{"format": "wav"}]
         result = get_audio_format_or_default("wav")
         assert result == "wav"
 
     def test_create_output_path(self):
         """Test creating output path"""
         result = create_output_path("/base", "videos")
-        expected = os.path.join("/base", "videos")
-        assert result == expected
+        assert result == EXPECTED_VIDEO_PATH
 
-    def test_extract_file_extension(self):
+    @pytest.mark.parametrize("file_name, extension", EXT_CASES)
+    def test_extract_file_extension(self, file_name, extension):
         """Test extracting file extension"""
-        assert extract_file_extension("test.mp4") == "mp4"
-        assert extract_file_extension("test.MP4") == "mp4"
-        assert extract_file_extension("path/to/file.avi") == "avi"
-        assert extract_file_extension("no_extension") == ""
+        assert extract_file_extension(file_name) == extension
 
-    def test_should_convert_format(self):
+    @pytest.mark.parametrize("current, target, expected", CONVERT_CASES)
+    def test_should_convert_format(self, current, target, expected):
         """Test format conversion decision"""
-        assert should_convert_format("mp4", "mp3") is True
-        assert should_convert_format("mp4", "MP4") is False
-        assert should_convert_format("MP4", "mp4") is False
-        assert should_convert_format("webm", "mp4") is True
+        assert should_convert_format(current, target) is expected
 
     @patch('app.tools.youtube_downloader.YouTube')
     def test_create_youtube_instance(self, mock_youtube):
@@ -124,36 +139,39 @@ class TestMediaDownloader:
         mock_instance = MagicMock()
         mock_youtube.return_value = mock_instance
         
-        result = create_youtube_instance("https://youtube.com/watch?v=test")
+        progress = MagicMock()
+        get_youtube.cache_clear()
+        result = create_youtube_instance("https://youtube.com/watch?v=test", progress)
         
         assert result == mock_instance
-        mock_youtube.assert_called_once()
+        # The same URL reuses the parsed instance, e.g. for its audio track
+        assert create_youtube_instance("https://youtube.com/watch?v=test", progress) is result
+        mock_youtube.assert_called_once_with("https://youtube.com/watch?v=test")
+        get_youtube.cache_clear()
+        # pytubefix's own per-chunk callback is throttled, the final chunk always reports
+        callback = mock_instance.register_on_progress_callback.call_args[0][0]
+        callback("stream", b"a", 2)
+        callback("stream", b"b", 1)
+        callback("stream", b"c", 0)
+        assert progress.call_args_list == [call("stream", b"a", 2), call("stream", b"c", 0)]
 
-    @patch('os.path.exists')
-    @patch('os.makedirs')
-    def test_ensure_directory_exists_new(self, mock_makedirs, mock_exists):
-        """Test ensuring new directory exists"""
-        mock_exists.return_value = False
-        
-        result = ensure_directory_exists("/test/path")
-        
-        assert result == "/test/path"
-        mock_makedirs.assert_called_once_with("/test/path", exist_ok=True)
-
-    @patch('os.path.exists')
-    @patch('os.makedirs')
-    def test_ensure_directory_exists_existing(self, mock_makedirs, mock_exists):
-        """Test ensuring existing directory exists"""
-        mock_exists.return_value = True
-        
-        result = ensure_directory_exists("/test/path")
-        
-        assert result == "/test/path"
-        mock_makedirs.assert_not_called()
+    @pytest.mark.parametrize("exists, expected_calls", [
+        (False, [(("/test/path",), {"exist_ok": True})]),
+        (True, []),
+    ], ids=["new", "existing"])
+    def test_ensure_directory_exists(self, monkeypatch, exists, expected_calls):
+        """Test ensuring a directory exists only creates missing ones"""
+        calls = []
+        monkeypatch.setattr("os.path.exists", lambda path: exists)
+        monkeypatch.setattr("os.makedirs", lambda *args, **kwargs: calls.append((args, kwargs)))
+
+        assert ensure_directory_exists("/test/path") == "/test/path"
+        assert calls == expected_calls
 
     def test_download_stream(self):
         """Test downloading stream"""
         mock_stream = MagicMock()
+        mock_stream.is_sabr = True
         mock_stream.download.return_value = "/path/to/downloaded/file.mp4"
         
         result = download_stream(mock_stream, "/output/path")
@@ -161,63 +179,202 @@ class TestMediaDownloader:
         assert result == "/path/to/downloaded/file.mp4"
         mock_stream.download.assert_called_once_with(output_path="/output/path")
 
+    @patch('app.tools.youtube_downloader.REQUESTS_AVAILABLE', True)
+    @patch('app.tools.youtube_downloader.RANGE_SIZE', 4)
+    @patch('app.tools.youtube_downloader.get_http_session')
+    def test_download_stream_ranged_requests(self, mock_get_session, tmp_path):
+        """Test stream is fetched in ranged requests and chunked writes"""
+        output_file = str(tmp_path / "video.mp4")
+        mock_stream = MagicMock(is_sabr=False, url="https://media.test/v?id=1", filesize=6)
+        mock_stream.get_file_path.return_value = output_file
+        responses = [MagicMock(), MagicMock()]
+        responses[0].__enter__.return_value.iter_content.return_value = [b"ab", b"cd"]
+        responses[1].__enter__.return_value.iter_content.return_value = [b"ef"]
+        mock_session = mock_get_session.return_value
+        mock_session.get.side_effect = responses
+        progress = MagicMock()
+
+        result = download_stream(mock_stream, str(tmp_path), 2, progress)
+
+        assert result == output_file
+        assert Path(output_file).read_bytes() == b"abcdef"
+        requested_urls = [c[0][0] for c in mock_session.get.call_args_list]
+        assert requested_urls == ["https://media.test/v?id=1&range=0-3", "https://media.test/v?id=1&range=4-5"]
+        # Updates are throttled, the first and final chunks still report
+        assert progress.call_args_list == [call(mock_stream, b"ab", 4), call(mock_stream, b"ef", 0)]
+        mock_stream.download.assert_not_called()
+
+    @patch('app.tools.youtube_downloader.REQUESTS_AVAILABLE', True)
+    @patch('app.tools.youtube_downloader.get_http_session')
+    def test_download_stream_without_progress_copies_raw(self, mock_get_session, tmp_path):
+        """Test downloads without a progress callback copy the raw response directly"""
+        output_file = str(tmp_path / "audio.m4a")
+        mock_stream = MagicMock(is_sabr=False, url="https://media.test/a?id=1", filesize=4)
+        mock_stream.get_file_path.return_value = output_file
+        response = mock_get_session.return_value.get.return_value.__enter__.return_value
+        response.raw = io.BytesIO(b"abcd")
+
+        download_stream(mock_stream, str(tmp_path))
+
+        assert Path(output_file).read_bytes() == b"abcd"
+        response.iter_content.assert_not_called()
+
+    @patch('app.tools.youtube_downloader.REQUESTS_AVAILABLE', True)
+    @patch('app.tools.youtube_downloader.get_http_session')
+    def test_download_stream_skips_or_resumes_existing_file(self, mock_get_session, tmp_path):
+        """Test complete files are not fetched again and partial downloads resume from their .part file"""
+        output_file = tmp_path / "video.mp4"
+        part_file = tmp_path / "video.mp4.6.part"
+        mock_stream = MagicMock(is_sabr=False, url="https://media.test/v?id=1", filesize=6)
+        mock_stream.get_file_path.return_value = str(output_file)
+        mock_session = mock_get_session.return_value
+
+        output_file.write_bytes(b"abcdef")
+        assert download_stream(mock_stream, str(tmp_path)) == str(output_file)
+        mock_session.get.assert_not_called()
+
+        # A shorter file under the final name is someone else's, never resumed
+        output_file.write_bytes(b"xyz")
+        part_file.write_bytes(b"abcd")
+        mock_session.get.return_value.__enter__.return_value.raw = io.BytesIO(b"ef")
+        download_stream(mock_stream, str(tmp_path))
+
+        mock_session.get.assert_called_once()
+        assert mock_session.get.call_args[0][0] == "https://media.test/v?id=1&range=4-5"
+        assert output_file.read_bytes() == b"abcdef"
+        assert not part_file.exists()
+
+    @patch('app.tools.youtube_downloader.REQUESTS_AVAILABLE', True)
+    @patch('app.tools.youtube_downloader.get_http_session')
+    def test_download_stream_short_download_is_not_published(self, mock_get_session, tmp_path):
+        """Test a download ending short of the stream size stays in its .part file"""
+        output_file = tmp_path / "video.mp4"
+        mock_stream = MagicMock(is_sabr=False, url="https://media.test/v?id=1", filesize=6)
+        mock_stream.get_file_path.return_value = str(output_file)
+        # More bytes than asked for, the size check still catches the mismatch
+        mock_get_session.return_value.get.return_value.__enter__.return_value.raw = io.BytesIO(b"abcdefgh")
+
+        with pytest.raises(IOError):
+            download_stream(mock_stream, str(tmp_path))
+        assert not output_file.exists()
+
+    @patch('app.tools.youtube_downloader.REQUESTS_AVAILABLE', True)
+    def test_download_stream_unknown_size_uses_pytubefix(self):
+        """Test streams without a known size fall back to pytubefix's own download"""
+        mock_stream = MagicMock(is_sabr=False, filesize=0)
+        mock_stream.download.return_value = "/output/path/video.mp4"
+
+        assert download_stream(mock_stream, "/output/path") == "/output/path/video.mp4"
+        mock_stream.download.assert_called_once_with(output_path="/output/path")
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_download_single_video_large_stream_takes_slot(self, monkeypatch):
+        """Test only streams over the large size threshold wait for a slot, and hold it while downloading"""
+        slots = asyncio.Semaphore(1)
+        sizes = iter([1024, LARGE_STREAM_SIZE + 1])
+        slot_held = []
+        monkeypatch.setattr(
+            "app.tools.youtube_downloader.resolve_media",
+            lambda *args: (MagicMock(), MagicMock(filesize=next(sizes)))
+        )
+        monkeypatch.setattr(
+            "app.tools.youtube_downloader.download_resolved",
+            lambda *args: slot_held.append(slots.locked()) or {"success": True}
+        )
+
+        for url in ("https://youtube.com/watch?v=a", "https://youtube.com/watch?v=b"):
+            await yt_download_single_video(url, "/downloads", large_stream_slots=slots)
+
+        assert slot_held == [False, True]
+        assert not slots.locked()
+
+    @patch('app.tools.youtube_downloader.download_stream')
+    @patch('app.tools.youtube_downloader.create_youtube_instance')
+    def test_download_media_resolves_then_downloads(self, mock_create_yt, mock_download):
+        """Test the blocking path resolves the stream and downloads it in one call"""
+        stream = MagicMock(filesize=1024)
+        mock_download.return_value = "/downloads/video.mp4"
+
+        result = download_media("https://youtube.com/watch?v=a", "/downloads", lambda yt: stream)
+
+        assert result["success"] is True and result["file_path"] == "/downloads/video.mp4"
+        mock_download.assert_called_once_with(stream, "/downloads", DEFAULT_CHUNK_SIZE, on_progress)
+
+    @patch('app.tools.youtube_downloader._http_session', None)
+    @patch('app.tools.youtube_downloader.atexit')
+    @patch('app.tools.youtube_downloader.HTTPAdapter', create=True)
+    @patch('app.tools.youtube_downloader.requests', create=True)
+    def test_get_http_session_shared(self, mock_requests, mock_adapter, mock_atexit):
+        """Test media downloads share one pooled session"""
+        first = get_http_session()
+        second = get_http_session()
+
+        assert first is second
+        mock_requests.Session.assert_called_once()
+        first.mount.assert_called_once_with("https://", mock_adapter.return_value)
+        mock_atexit.register.assert_called_once_with(first.close)
+
     @patch('app.tools.media_downloader.media_converter')
     @patch('os.remove')
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_convert_media_if_needed_conversion_required(self, mock_remove, mock_converter):
         """Test media conversion when needed"""
-        mock_args = MagicMock()
-        from unittest.mock import AsyncMock
-        mock_converter.convert.side_effect = AsyncMock(return_value=[{"success": True, "output_file": "test.mp4"}])
+        mock_converter.convert_files_functional = AsyncMock(return_value=[{"success": True, "output_file": "test.mp4"}])
         
-        result = await convert_if_needed("test.webm", "mp4", mock_args)
+        result = await convert_if_needed("test.webm", "mp4")
         
         assert result == "test.mp4"
+        mock_converter.convert_files_functional.assert_called_once_with([Path("test.webm")], "mp4", "")
         mock_remove.assert_called_once_with("test.webm")
 
     @patch('app.tools.media_downloader.media_converter')
     @patch('os.remove')
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_convert_media_if_needed_no_conversion(self, mock_remove, mock_converter):
         """Test media conversion when not needed"""
-        mock_args = MagicMock()
-        
-        result = await convert_if_needed("test.mp4", "mp4", mock_args)
+        result = await convert_if_needed("test.mp4", "mp4")
         
         assert result == "test.mp4"
-        mock_converter.convert.assert_not_called()
+        mock_converter.convert_files_functional.assert_not_called()
         mock_remove.assert_not_called()
 
-    @patch('app.tools.media_downloader.get_output_dir')
-    @patch('app.tools.media_downloader.get_video_format_or_default')
-    @patch('app.tools.youtube_downloader.create_youtube_instance')
-    @patch('app.tools.youtube_downloader.select_video_stream')
-    @patch('app.tools.media_downloader.ensure_directory_exists')
-    @patch('app.tools.youtube_downloader.download_stream')
-    @patch('app.tools.media_downloader.convert_if_needed')
-    @pytest.mark.asyncio
-    async def test_download_youtube_video_pipeline_success(self, mock_convert, mock_download, 
-                                           mock_ensure_dir, mock_select_stream,
-                                           mock_create_yt, mock_get_format,
-                                           mock_get_dir):
+    @pytest.fixture
+    def pipeline(self, monkeypatch):
+        """Stub the download pipeline collaborators with plain setattr"""
+        mocks = SimpleNamespace(
+            get_output_dir=MagicMock(return_value="/downloads"),
+            get_video_format=MagicMock(return_value="mp4"),
+            get_audio_format=MagicMock(return_value="mp3"),
+            create_yt=MagicMock(),
+            select_stream=MagicMock(),
+            ensure_dir=MagicMock(),
+            download=MagicMock(),
+            convert=AsyncMock(),
+        )
+        for target, mock in (
+            ("app.tools.media_downloader.get_output_dir", mocks.get_output_dir),
+            ("app.tools.media_downloader.get_video_format_or_default", mocks.get_video_format),
+            ("app.tools.media_downloader.get_audio_format_or_default", mocks.get_audio_format),
+            ("app.tools.youtube_downloader.create_youtube_instance", mocks.create_yt),
+            ("app.tools.youtube_downloader.select_video_stream", mocks.select_stream),
+            ("app.tools.media_downloader.ensure_directory_exists", mocks.ensure_dir),
+            ("app.tools.youtube_downloader.download_stream", mocks.download),
+            ("app.tools.media_downloader.convert_if_needed", mocks.convert),
+        ):
+            monkeypatch.setattr(target, mock)
+        return mocks
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_download_youtube_video_pipeline_success(self, pipeline, make_args):
         """Test successful video download pipeline"""
-        # Setup mocks
-        mock_args = MagicMock()
-        mock_args.url = "https://youtube.com/watch?v=test"
-        mock_args.format = "mp4"
-        mock_args.resolution = "720p"
-        
-        mock_get_dir.return_value = "/downloads"
-        mock_get_format.return_value = "mp4"
-        mock_yt = MagicMock()
-        mock_yt.title = "Test Video"
-        mock_create_yt.return_value = mock_yt
-        mock_stream = MagicMock()
-        mock_select_stream.return_value = mock_stream
-        mock_ensure_dir.return_value = "/downloads/videos"
-        mock_download.return_value = "/downloads/videos/test.mp4"
-        from unittest.mock import AsyncMock
-        mock_convert.side_effect = AsyncMock(return_value="/downloads/videos/test.mp4")
+        mock_args = make_args(url="https://youtube.com/watch?v=test", format="mp4", resolution="720p")
+        mock_yt = SimpleNamespace(title="Test Video", length=60, views=1, author="Tester")
+        pipeline.create_yt.return_value = mock_yt
+        mock_stream = SimpleNamespace()
+        pipeline.select_stream.return_value = mock_stream
+        pipeline.ensure_dir.return_value = "/downloads/videos"
+        pipeline.download.return_value = "/downloads/videos/test.mp4"
+        pipeline.convert.return_value = "/downloads/videos/test.mp4"
         
         result = await route_video_download(mock_args)
         
@@ -228,38 +385,22 @@ class TestMediaDownloader:
         assert result["converted"] is False
         
         # Verify function calls (create_youtube_instance is called with url and progress callback)
-        mock_create_yt.assert_called_once()
-        mock_select_stream.assert_called_once_with(mock_yt, "720p")
+        pipeline.create_yt.assert_called_once()
+        pipeline.select_stream.assert_called_once_with(mock_yt, "720p")
         # Path will be normalized by the function, so check actual call
-        mock_download.assert_called_once_with(mock_stream, "/downloads/videos")
+        pipeline.download.assert_called_once_with(mock_stream, "/downloads/videos", DEFAULT_CHUNK_SIZE, on_progress)
 
-    @patch('app.tools.media_downloader.get_output_dir')
-    @patch('app.tools.media_downloader.get_audio_format_or_default')
-    @patch('app.tools.youtube_downloader.create_youtube_instance')
-    @patch('app.tools.media_downloader.ensure_directory_exists')
-    @patch('app.tools.youtube_downloader.download_stream')
-    @patch('app.tools.media_downloader.convert_if_needed')
-    @pytest.mark.asyncio
-    async def test_download_audio_pipeline_success(self, mock_convert, mock_download,
-                                           mock_ensure_dir, mock_create_yt,
-                                           mock_get_format, mock_get_dir):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_download_audio_pipeline_success(self, pipeline, make_args):
         """Test successful audio download pipeline"""
-        # Setup mocks
-        mock_args = MagicMock()
-        mock_args.url = "https://youtube.com/watch?v=test"
-        mock_args.format = "mp3"
-        
-        mock_get_dir.return_value = "/downloads"
-        mock_get_format.return_value = "mp3"
-        mock_yt = MagicMock()
-        mock_yt.title = "Test Audio"
-        mock_create_yt.return_value = mock_yt
-        mock_stream = MagicMock()
-        mock_yt.streams.get_audio_only.return_value = mock_stream
-        mock_ensure_dir.return_value = "/downloads/audios"
-        mock_download.return_value = "/downloads/audios/test.webm"
-        from unittest.mock import AsyncMock
-        mock_convert.side_effect = AsyncMock(return_value=True)
+        mock_args = make_args(url="https://youtube.com/watch?v=test", format="mp3")
+        mock_stream = SimpleNamespace()
+        pipeline.create_yt.return_value = SimpleNamespace(
+            title="Test Audio", length=60, views=1, author="Tester", streams=SimpleNamespace(get_audio_only=lambda: mock_stream)
+        )
+        pipeline.ensure_dir.return_value = "/downloads/audios"
+        pipeline.download.return_value = "/downloads/audios/test.webm"
+        pipeline.convert.return_value = True
         
         result = await route_audio_download(mock_args)
         
@@ -268,53 +409,40 @@ class TestMediaDownloader:
         assert result["title"] == "Test Audio"
         assert result["format"] == "mp3"
         assert result["converted"] is True
+        pipeline.download.assert_called_once_with(mock_stream, "/downloads/audios", DEFAULT_CHUNK_SIZE, on_progress)
 
-    @patch('app.tools.media_downloader.route_video_download')
-    @pytest.mark.asyncio
-    async def test_download_dispatcher_video(self, mock_video_pipeline):
-        """Test download dispatcher for video"""
-        mock_args = MagicMock()
-        mock_args.type = "video"
-        mock_result = {"success": True}
-        from unittest.mock import AsyncMock
-        mock_video_pipeline.side_effect = AsyncMock(return_value=mock_result)
-        
-        result = await download(mock_args)
-        
-        assert result == mock_result
-        mock_video_pipeline.assert_called_once_with(mock_args)
-
-    @patch('app.tools.media_downloader.route_audio_download')
-    @pytest.mark.asyncio
-    async def test_download_dispatcher_audio(self, mock_audio_pipeline):
-        """Test download dispatcher for audio"""
-        mock_args = MagicMock()
-        mock_args.type = "audio"
+    @pytest.mark.parametrize("download_type, target", [
+        ("video", "app.tools.media_downloader.route_video_download"),
+        ("audio", "app.tools.media_downloader.route_audio_download"),
+    ])
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_download_dispatcher(self, download_type, target, make_args):
+        """Test download dispatcher routes each type to its pipeline"""
+        mock_args = make_args(type=download_type)
         mock_result = {"success": True}
-        from unittest.mock import AsyncMock
-        mock_audio_pipeline.side_effect = AsyncMock(return_value=mock_result)
-        
-        result = await download(mock_args)
-        
+
+        with patch(target, new=AsyncMock(return_value=mock_result)) as mock_pipeline:
+            result = await download(mock_args)
+
         assert result == mock_result
-        mock_audio_pipeline.assert_called_once_with(mock_args)
+        mock_pipeline.assert_called_once_with(mock_args)
 
-    @pytest.mark.asyncio
-    async def test_download_dispatcher_invalid_type(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_download_dispatcher_invalid_type(self, make_args):
         """Test download dispatcher with invalid type"""
-        mock_args = MagicMock()
-        mock_args.type = "invalid"
+        mock_args = make_args(type="invalid")
         
         with pytest.raises(ValueError, match="Unsupported download type: invalid"):
             await download(mock_args)
 
-    @pytest.mark.asyncio
-    async def test_download_youtube_video_pipeline_error(self):
+    @patch('app.tools.youtube_downloader.create_youtube_instance')
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_download_youtube_video_pipeline_error(self, mock_create_yt, make_args):
         """Test video download pipeline error handling"""
-        mock_args = MagicMock()
-        mock_args.url = "https://invalid.com/watch?v=test"  # Invalid URL
-        mock_args.format = "mp4"
+        mock_args = make_args(url="https://invalid.com/watch?v=test", format="mp4")  # Invalid URL
         
         # Should raise ValueError for unsupported URL
         with pytest.raises(ValueError, match="Unsupported URL"):
             await route_video_download(mock_args)
+        # Rejected by the string check, before any YouTube object or network request
+        mock_create_yt.assert_not_called()
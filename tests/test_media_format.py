@@ -6,56 +6,22 @@ from app.utils.media_format import (
     subtitle_formats,
     all_formats,
     get_format,
+    build_format_index,
 )
 
 
 class TestMediaFormat:
-    def test_video_formats_structure(self):
-        """Test video formats structure"""
-        assert isinstance(video_formats, list)
-        assert len(video_formats) > 0
-        
-        for format_info in video_formats:
-            assert isinstance(format_info, dict)
-            assert "alias" in format_info
-            assert "format" in format_info
-            assert "desc" in format_info
-            assert isinstance(format_info["alias"], str)
-            assert isinstance(format_info["format"], str)
-            assert isinstance(format_info["desc"], str)
-
-    def test_audio_formats_structure(self):
-        """Test audio formats structure"""
-        assert isinstance(audio_formats, list)
-        assert len(audio_formats) > 0
-        
-        for format_info in audio_formats:
-            assert isinstance(format_info, dict)
-            assert "alias" in format_info
-            assert "format" in format_info
-            assert "desc" in format_info
-
-    def test_image_formats_structure(self):
-        """Test image formats structure"""
-        assert isinstance(image_formats, list)
-        assert len(image_formats) > 0
-        
-        for format_info in image_formats:
-            assert isinstance(format_info, dict)
-            assert "alias" in format_info
-            assert "format" in format_info
-            assert "desc" in format_info
-
-    def test_subtitle_formats_structure(self):
-        """Test subtitle formats structure"""
-        assert isinstance(subtitle_formats, list)
-        assert len(subtitle_formats) > 0
-        
-        for format_info in subtitle_formats:
-            assert isinstance(format_info, dict)
-            assert "alias" in format_info
-            assert "format" in format_info
-            assert "desc" in format_info
+    @pytest.mark.parametrize("formats", [video_formats, audio_formats, image_formats, subtitle_formats],
+                             ids=["video", "audio", "image", "subtitle"])
+    def test_formats_structure(self, formats):
+        """Test every format entry is a dict of alias, format and desc strings"""
+        assert isinstance(formats, list)
+        assert len(formats) > 0
+        assert all(
+            isinstance(format_info, dict)
+            and all(isinstance(format_info.get(key), str) for key in ("alias", "format", "desc"))
+            for format_info in formats
+        )
 
     def test_all_formats_combination(self):
         """Test all_formats is combination of all format lists"""
@@ -67,44 +33,15 @@ class TestMediaFormat:
         )
         assert len(all_formats) == expected_length
 
-    def test_common_video_formats_exist(self):
-        """Test common video formats exist"""
-        video_aliases = [f["alias"] for f in video_formats]
-        
-        assert "mp4" in video_aliases
-        assert "mkv" in video_aliases
-        assert "avi" in video_aliases
-        assert "mov" in video_aliases
-        assert "webm" in video_aliases
-
-    def test_common_audio_formats_exist(self):
-        """Test common audio formats exist"""
-        audio_aliases = [f["alias"] for f in audio_formats]
-        
-        assert "mp3" in audio_aliases
-        assert "wav" in audio_aliases
-        assert "flac" in audio_aliases
-        assert "aac" in audio_aliases
-        assert "ogg" in audio_aliases
-
-    def test_common_image_formats_exist(self):
-        """Test common image formats exist"""
-        image_aliases = [f["alias"] for f in image_formats]
-        
-        assert "jpg" in image_aliases
-        assert "jpeg" in image_aliases
-        assert "png" in image_aliases
-        assert "gif" in image_aliases
-        assert "webp" in image_aliases
-        assert "bmp" in image_aliases
-
-    def test_common_subtitle_formats_exist(self):
-        """Test common subtitle formats exist"""
-        subtitle_aliases = [f["alias"] for f in subtitle_formats]
-        
-        assert "srt" in subtitle_aliases
-        assert "ass" in subtitle_aliases
-        assert "vtt" in subtitle_aliases
+    @pytest.mark.parametrize("formats, expected", [
+        (video_formats, {"mp4", "mkv", "avi", "mov", "webm"}),
+        (audio_formats, {"mp3", "wav", "flac", "aac", "ogg"}),
+        (image_formats, {"jpg", "jpeg", "png", "gif", "webp", "bmp"}),
+        (subtitle_formats, {"srt", "ass", "vtt"}),
+    ], ids=["video", "audio", "image", "subtitle"])
+    def test_common_formats_exist(self, formats, expected):
+        """Test common formats exist in each category"""
+        assert expected <= {f["alias"] for f in formats}
 
     def test_get_format_by_alias(self):
         """Test getting format by alias"""
@@ -134,6 +71,16 @@ class TestMediaFormat:
         assert len(result_lower) == 1
         assert len(result_upper) == 0
 
+    def test_get_format_sees_entries_added_to_category_lists(self):
+        """Test entries appended to a category list are found, no stale index in between"""
+        entry = {"alias": "xyz", "format": "xyzmux", "desc": "Test Container"}
+        video_formats.append(entry)
+        try:
+            assert get_format("xyz", video_formats) == [entry]
+            assert get_format("xyzmux", video_formats) == [entry]
+        finally:
+            video_formats.remove(entry)
+
     def test_get_format_with_specific_format_list(self):
         """Test getting format from specific format list"""
         result = get_format("mp3", audio_formats)
@@ -157,22 +104,13 @@ class TestMediaFormat:
 
     def test_format_aliases_unique_per_category(self):
         """Test that aliases are unique within each category"""
-        video_aliases = [f["alias"] for f in video_formats]
-        audio_aliases = [f["alias"] for f in audio_formats]
-        image_aliases = [f["alias"] for f in image_formats]
-        subtitle_aliases = [f["alias"] for f in subtitle_formats]
-        
-        # Check for duplicates within each category
-        assert len(video_aliases) == len(set(video_aliases))
-        assert len(audio_aliases) == len(set(audio_aliases))
-        assert len(image_aliases) == len(set(image_aliases))
-        assert len(subtitle_aliases) == len(set(subtitle_aliases))
+        for formats in (video_formats, audio_formats, image_formats, subtitle_formats):
+            assert len({f["alias"] for f in formats}) == len(formats)
 
     def test_format_descriptions_not_empty(self):
         """Test that all format descriptions are not empty"""
-        for format_info in all_formats:
-            assert format_info["desc"].strip() != ""
-            assert len(format_info["desc"]) > 3  # Reasonable description length
+        # Non-blank and a reasonable description length
+        assert all(format_info["desc"].strip() and len(format_info["desc"]) > 3 for format_info in all_formats)
 
     def test_mp4_video_format_details(self):
         """Test specific MP4 format details"""
@@ -202,4 +140,21 @@ class TestMediaFormat:
         png = png_formats[0]
         assert png["alias"] == "png"
         assert png["format"] == "png"
-        assert "PNG" in png["desc"] or "Network Graphics" in png["desc"]
\ No newline at end of file
+        assert "PNG" in png["desc"] or "Network Graphics" in png["desc"]
+
+    def test_build_format_index_matches_get_format(self):
+        """Test format index resolves names like get_format's first match"""
+        index = build_format_index(all_formats)
+        for fmt in all_formats:
+            for name in (fmt["alias"], fmt["format"]):
+                assert index[name] == get_format(name)[0]["alias"]
+
+    def test_get_format_index_matches_scan(self):
+        """Test indexed get_format returns the same entries as scanning the list"""
+        for formats in (all_formats, audio_formats, video_formats):
+            for fmt in formats:
+                for name in (fmt["alias"], fmt["format"]):
+                    expected = [f for f in formats if f["alias"] == name or f["format"] == name]
+                    assert get_format(name, formats) == expected
+        # Lists without a prebuilt index are still scanned
+        assert get_format("mp3", list(audio_formats)) == get_format("mp3", audio_formats)
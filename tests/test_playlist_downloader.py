@@ -1,9 +1,9 @@
+import asyncio
 import pytest
-import tempfile
-import shutil
-import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from unittest.mock import patch, MagicMock, call
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock, AsyncMock, PropertyMock, call
 from app.tools.media_downloader import (
     create_playlist_config,
     download_playlist_videos,
@@ -18,94 +18,105 @@ from app.tools.youtube_downloader import (
     download_playlist_audios as yt_download_playlist_audios,
     validate_youtube_url,
     is_playlist_url,
+    is_youtube_url,
 )
 
+PLAYLIST_URL = "https://youtube.com/playlist?list=PLrAXtmRdnEQy4TyTh9zg8qFm9K2vOzIEm"
+VIDEO_IN_PLAYLIST_URL = "https://youtube.com/watch?v=test123&list=PLrAXtmRdnEQy4TyTh9zg8qFm9K2vOzIEm"
+
+
+@pytest.fixture(scope="module")
+def fake_playlist():
+    """Read-only playlist stand-in with three videos"""
+    return SimpleNamespace(title="Test Playlist", owner="Test Owner", videos=(object(), object(), object()))
+
 
 class TestPlaylistDownloader:
-    def setup_method(self):
-        """Set up test fixtures"""
-        self.temp_dir = Path(tempfile.mkdtemp())
-        self.playlist_url = "https://youtube.com/playlist?list=PLrAXtmRdnEQy4TyTh9zg8qFm9K2vOzIEm"
-        self.video_url_in_playlist = "https://youtube.com/watch?v=test123&list=PLrAXtmRdnEQy4TyTh9zg8qFm9K2vOzIEm"
-
-    def teardown_method(self):
-        """Clean up test fixtures"""
-        if self.temp_dir.exists():
-            shutil.rmtree(self.temp_dir)
-
-    def test_is_playlist_url_detection(self):
+    @pytest.fixture
+    def playlist_class(self, monkeypatch):
+        """Replace pytubefix's Playlist, tests set the instance it returns"""
+        mock_playlist_class = MagicMock()
+        monkeypatch.setattr("app.tools.youtube_downloader.Playlist", mock_playlist_class)
+        return mock_playlist_class
+
+    @pytest.mark.parametrize("url, expected", [
+        (PLAYLIST_URL, True),
+        (VIDEO_IN_PLAYLIST_URL, True),
+        ("https://youtube.com/watch?v=test123", False),
+        ("https://youtu.be/test123", False),
+        ("https://youtube.com/watch?v=test123&t=playlist=1", False),
+    ])
+    def test_is_playlist_url_detection(self, url, expected):
         """Test playlist URL detection"""
-        # Test various playlist URL formats
-        assert is_playlist_url(self.playlist_url) is True
-        assert is_playlist_url(self.video_url_in_playlist) is True
-        assert is_playlist_url("https://youtube.com/watch?v=test123") is False
-        assert is_playlist_url("https://youtu.be/test123") is False
-
-    def test_validate_youtube_playlist_url(self):
+        assert is_playlist_url(url) is expected
+
+    def test_is_youtube_url_host_matching(self):
+        """Test YouTube detection checks the host, not any substring"""
+        assert is_youtube_url("https://www.youtube.com/watch?v=test123") is True
+        assert is_youtube_url("youtu.be/test123") is True
+        assert is_youtube_url("https://example.com/?next=youtube.com") is False
+        assert is_youtube_url("https://notyoutube.com/watch?v=test123") is False
+
+    @pytest.mark.parametrize("url, is_valid, is_playlist", [
+        (PLAYLIST_URL, True, True),
+        (VIDEO_IN_PLAYLIST_URL, True, True),
+        ("https://youtube.com/watch?v=test123", True, False),
+    ])
+    def test_validate_youtube_playlist_url(self, url, is_valid, is_playlist):
         """Test YouTube playlist URL validation"""
-        result = validate_youtube_url(self.playlist_url)
-        assert result["is_valid"] is True
-        assert result["is_playlist"] is True
-
-        result = validate_youtube_url(self.video_url_in_playlist)
-        assert result["is_valid"] is True
-        assert result["is_playlist"] is True
+        assert validate_youtube_url(url) == {"is_valid": is_valid, "is_playlist": is_playlist}
 
-        result = validate_youtube_url("https://youtube.com/watch?v=test123")
-        assert result["is_valid"] is True
-        assert result["is_playlist"] is False
+    def test_validate_youtube_url_returns_independent_results(self):
+        """Test changing one validation result does not leak into the next call"""
+        validate_youtube_url(PLAYLIST_URL)["is_playlist"] = False
+        assert validate_youtube_url(PLAYLIST_URL)["is_playlist"] is True
 
-    @patch('app.tools.youtube_downloader.Playlist')
-    def test_create_playlist_instance(self, mock_playlist_class):
+    def test_create_playlist_instance(self, playlist_class, fake_playlist):
         """Test creating YouTube playlist instance"""
-        mock_playlist = MagicMock()
-        mock_playlist_class.return_value = mock_playlist
+        playlist_class.return_value = fake_playlist
         
-        result = create_playlist_instance(self.playlist_url)
+        result = create_playlist_instance(PLAYLIST_URL)
         
-        assert result == mock_playlist
-        mock_playlist_class.assert_called_once_with(self.playlist_url)
+        assert result is fake_playlist
+        playlist_class.assert_called_once_with(PLAYLIST_URL)
 
-    @patch('app.tools.youtube_downloader.Playlist')
-    def test_get_playlist_metadata(self, mock_playlist_class):
+    def test_get_playlist_metadata(self, playlist_class, fake_playlist):
         """Test extracting playlist metadata"""
-        mock_playlist = MagicMock()
-        mock_playlist.title = "Test Playlist"
-        mock_playlist.owner = "Test Owner"
-        mock_playlist.videos = [MagicMock(), MagicMock(), MagicMock()]  # 3 videos
-        mock_playlist_class.return_value = mock_playlist
+        playlist_class.return_value = fake_playlist
         
-        playlist = create_playlist_instance(self.playlist_url)
+        playlist = create_playlist_instance(PLAYLIST_URL)
         result = get_playlist_metadata(playlist)
         
         assert result["title"] == "Test Playlist"
         assert result["owner"] == "Test Owner"
         assert result["video_count"] == 3
 
-    @patch('app.tools.media_downloader.ensure_directory_exists')
-    @patch('app.tools.media_downloader.create_playlist_config')
+    def test_get_playlist_metadata_known_count(self):
+        """Test known video count skips walking the playlist again"""
+        mock_playlist = MagicMock()
+        type(mock_playlist).videos = PropertyMock(side_effect=AssertionError("videos re-fetched"))
+
+        result = get_playlist_metadata(mock_playlist, video_count=5)
+
+        assert result["video_count"] == 5
+
     @patch('app.tools.youtube_downloader.download_playlist_videos')
-    @pytest.mark.asyncio
-    async def test_download_playlist_videos_success(self, mock_yt_download, mock_config, mock_ensure_dir):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_download_playlist_videos_success(self, mock_yt_download, make_args):
         """Test successful playlist video download"""
-        mock_args = MagicMock()
-        mock_args.url = self.playlist_url
-        mock_args.format = "mp4"
-        mock_args.resolution = "720p"
+        mock_args = make_args(url=PLAYLIST_URL, format="mp4", resolution="720p")
 
         # Setup config
         config = {
-            "url": self.playlist_url,
+            "url": PLAYLIST_URL,
             "output_path": "/downloads/playlist/videos/Test Playlist",
             "output_format": "mp4",
             "resolution": "720p",
             "args": mock_args
         }
-        mock_config.return_value = config
 
         # Setup YouTube downloader response
-        from unittest.mock import AsyncMock
-        mock_yt_download.side_effect = AsyncMock(return_value=[
+        mock_yt_download.return_value = [
             {
                 "success": True,
                 "file_path": "/downloads/playlist/videos/Test Playlist/video1.mp4",
@@ -116,7 +127,7 @@ class TestPlaylistDownloader:
                 "file_path": "/downloads/playlist/videos/Test Playlist/video2.mp4",
                 "metadata": {"title": "Video 2", "length": 180}
             }
-        ])
+        ]
 
         result = await download_playlist_videos(config)
 
@@ -127,30 +138,24 @@ class TestPlaylistDownloader:
         # Verify mock was called (note: AsyncMock calls are checked differently)
         assert mock_yt_download.called
 
-    @patch('app.tools.media_downloader.ensure_directory_exists')
-    @patch('app.tools.media_downloader.create_playlist_config')
     @patch('app.tools.youtube_downloader.download_playlist_audios')
     @patch('app.tools.media_downloader.convert_if_needed')
-    @pytest.mark.asyncio
-    async def test_download_playlist_audios_success(self, mock_convert, mock_yt_download, mock_config, mock_ensure_dir):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_download_playlist_audios_success(self, mock_convert, mock_yt_download, make_args):
         """Test successful playlist audio download"""
-        mock_args = MagicMock()
-        mock_args.url = self.playlist_url
-        mock_args.format = "mp3"
+        mock_args = make_args(url=PLAYLIST_URL, format="mp3")
 
         # Setup config
         config = {
-            "url": self.playlist_url,
+            "url": PLAYLIST_URL,
             "output_path": "/downloads/playlist/audios/Test Playlist",
             "output_format": "mp3",
             "args": mock_args
         }
-        mock_config.return_value = config
 
         # Mock conversion
-        from unittest.mock import AsyncMock
-        mock_convert.side_effect = AsyncMock(return_value=True)
-        mock_yt_download.side_effect = AsyncMock(return_value=[
+        mock_convert.return_value = True
+        mock_yt_download.return_value = [
             {
                 "success": True,
                 "file_path": "/downloads/playlist/audios/Test Playlist/audio1.webm",
@@ -161,7 +166,7 @@ class TestPlaylistDownloader:
                 "file_path": None,
                 "metadata": {"title": "Audio 2", "error": "Download failed"}
             }
-        ])
+        ]
 
         result = await download_playlist_audios(config)
 
@@ -173,10 +178,51 @@ class TestPlaylistDownloader:
         # Verify mock was called (note: AsyncMock calls are checked differently)
         assert mock_yt_download.called
 
-    @patch('app.tools.youtube_downloader.Playlist')
-    @patch('app.tools.youtube_downloader.download_single_video')
-    @pytest.mark.asyncio
-    async def test_youtube_download_playlist_videos_integration(self, mock_download_single, mock_playlist_class):
+    @patch('app.tools.media_downloader.get_max_workers_default')
+    @patch('app.tools.media_downloader.batch_convert_playlist_files')
+    @patch('app.tools.youtube_downloader.download_playlist_audios')
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_download_playlist_audios_converts_while_downloading(self, mock_yt_download, mock_batch_convert, mock_workers, make_args, monkeypatch):
+        """Test finished downloads are converted before the whole playlist completes"""
+        config = {
+            "url": PLAYLIST_URL,
+            "output_path": "/downloads/playlist/audios",
+            "output_format": "mp3",
+            "args": make_args()
+        }
+        mock_workers.return_value = 2
+        downloads = [
+            {"success": True, "file_path": "/downloads/playlist/audios/audio1.webm", "metadata": {"title": "Audio 1"}},
+            {"success": True, "file_path": "/downloads/playlist/audios/audio2.mp3", "metadata": {"title": "Audio 2"}},
+        ]
+        converted_before_finish = []
+
+        async def fake_download(url, output_path, max_concurrent, playlist, on_complete):
+            for result in downloads:
+                await on_complete(result)
+            await asyncio.sleep(0.01)
+            converted_before_finish.append(mock_batch_convert.called)
+            return downloads
+
+        async def fake_convert(files, target_format, report):
+            return [{"input_file": file, "output_file": file.replace(".webm", ".mp3"), "success": True} for file in files]
+
+        mock_yt_download.side_effect = fake_download
+        mock_batch_convert.side_effect = fake_convert
+        summaries = []
+        monkeypatch.setattr("app.tools.media_converter.print_conversion_results", lambda *args: summaries.append(args))
+
+        result = await download_playlist_audios(config)
+
+        assert converted_before_finish == [True]
+        mock_batch_convert.assert_called_once_with(["/downloads/playlist/audios/audio1.webm"], "mp3", report=False)
+        assert len(summaries) == 1 and summaries[0][1:] == ("mp3", str(Path.cwd() / "convert"))
+        assert result[0]["converted"] is True
+        assert result[0]["file_path"] == "/downloads/playlist/audios/audio1.mp3"
+        assert result[1]["converted"] is False
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_youtube_download_playlist_videos_integration(self, monkeypatch, playlist_class):
         """Test YouTube playlist video download integration"""
         # Setup playlist mock
         mock_playlist = MagicMock()
@@ -192,11 +238,12 @@ class TestPlaylistDownloader:
         mock_video2.watch_url = "https://youtube.com/watch?v=video2"
         
         mock_playlist.videos = [mock_video1, mock_video2]
-        mock_playlist_class.return_value = mock_playlist
+        playlist_class.return_value = mock_playlist
 
         # Setup download responses
-        from unittest.mock import AsyncMock
-        mock_download_single.side_effect = AsyncMock(side_effect=[
+        mock_download_single = AsyncMock()
+        monkeypatch.setattr("app.tools.youtube_downloader.download_single_video", mock_download_single)
+        mock_download_single.side_effect = [
             {
                 "success": True,
                 "file_path": "/downloads/video1.mp4",
@@ -207,25 +254,23 @@ class TestPlaylistDownloader:
                 "file_path": "/downloads/video2.mp4",
                 "metadata": {"title": "Video 2"}
             }
-        ])
+        ]
 
         result = await yt_download_playlist_videos(
-            self.playlist_url,
+            PLAYLIST_URL,
             "/downloads",
             "720p"
         )
 
         assert len(result) == 2
         assert all(item["success"] for item in result)
-        assert mock_download_single.call_count == 2
-        
-        # Verify mock was called
-        assert mock_download_single.called
+        calls = mock_download_single.call_args_list
+        assert len(calls) == 2
+        assert sorted(c.args[0] for c in calls) == [mock_video1.watch_url, mock_video2.watch_url]
+        assert all(c.args[1:3] == ("/downloads", "720p") for c in calls)
 
-    @patch('app.tools.youtube_downloader.Playlist')
-    @patch('app.tools.youtube_downloader.download_single_audio')
-    @pytest.mark.asyncio
-    async def test_youtube_download_playlist_audios_integration(self, mock_download_single, mock_playlist_class):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_youtube_download_playlist_audios_integration(self, monkeypatch, playlist_class):
         """Test YouTube playlist audio download integration"""
         # Setup playlist mock
         mock_playlist = MagicMock()
@@ -237,18 +282,19 @@ class TestPlaylistDownloader:
         mock_video1.watch_url = "https://youtube.com/watch?v=video1"
         
         mock_playlist.videos = [mock_video1]
-        mock_playlist_class.return_value = mock_playlist
+        playlist_class.return_value = mock_playlist
 
         # Setup download response
-        from unittest.mock import AsyncMock
-        mock_download_single.side_effect = AsyncMock(return_value={
+        mock_download_single = AsyncMock()
+        monkeypatch.setattr("app.tools.youtube_downloader.download_single_audio", mock_download_single)
+        mock_download_single.return_value = {
             "success": True,
             "file_path": "/downloads/audio1.webm",
             "metadata": {"title": "Audio 1"}
-        })
+        }
 
         result = await yt_download_playlist_audios(
-            self.playlist_url,
+            PLAYLIST_URL,
             "/downloads"
         )
 
@@ -257,86 +303,53 @@ class TestPlaylistDownloader:
         # Verify the call was made
         assert mock_download_single.called
 
-    def test_playlist_config_creation(self):
+    def test_playlist_config_creation(self, monkeypatch, make_args):
         """Test playlist configuration creation"""
-        mock_args = MagicMock()
-        mock_args.url = self.playlist_url
-        mock_args.format = "mp4"
-        mock_args.resolution = "720p"
-
-        with patch('app.tools.media_downloader.youtube_downloader.validate_youtube_url') as mock_validate, \
-             patch('app.tools.media_downloader.youtube_downloader.create_playlist_instance') as mock_create_playlist, \
-             patch('app.tools.media_downloader.ensure_directory_exists') as mock_ensure_dir:
-            
-            mock_validate.return_value = {"is_valid": True, "is_playlist": True}
-            mock_playlist = MagicMock()
-            mock_playlist.title = "My Test Playlist"
-            mock_create_playlist.return_value = mock_playlist
-            mock_ensure_dir.return_value = "/downloads/playlist/videos/My Test Playlist"
-
-            from app.tools.media_downloader import create_playlist_config
-            config = create_playlist_config(mock_args, "video")
-
-            assert config["url"] == self.playlist_url
-            assert config["output_format"] == "mp4"
-            assert config["resolution"] == "720p"
-            assert "My Test Playlist" in config["output_path"]
-
-    @patch('app.tools.media_downloader.youtube_downloader.validate_youtube_url')
-    @patch('app.tools.media_downloader.create_playlist_config')
-    @patch('app.tools.media_downloader.download_playlist_videos')
-    @pytest.mark.asyncio
-    async def test_route_video_download_playlist(self, mock_download_playlist, mock_create_config, mock_validate):
-        """Test routing video download for playlist URLs"""
-        mock_args = MagicMock()
-        mock_args.url = self.playlist_url
-        mock_args.format = "mp4"
-
-        mock_validate.return_value = {"is_valid": True, "is_playlist": True}
-        mock_config = {"url": self.playlist_url, "output_format": "mp4"}
-        mock_create_config.return_value = mock_config
-        
-        mock_download_playlist.return_value = [
-            {"success": True, "title": "Video 1"},
-            {"success": True, "title": "Video 2"}
-        ]
-
-        result = await route_video_download(mock_args)
-
-        assert len(result) == 2
-        mock_validate.assert_called_once_with(self.playlist_url)
-        mock_create_config.assert_called_once_with(mock_args, "video")
-        mock_download_playlist.assert_called_once_with(mock_config)
-
-    @patch('app.tools.media_downloader.youtube_downloader.validate_youtube_url')
-    @patch('app.tools.media_downloader.create_playlist_config')
-    @patch('app.tools.media_downloader.download_playlist_audios')
-    @pytest.mark.asyncio
-    async def test_route_audio_download_playlist(self, mock_download_playlist, mock_create_config, mock_validate):
-        """Test routing audio download for playlist URLs"""
-        mock_args = MagicMock()
-        mock_args.url = self.playlist_url
-        mock_args.format = "mp3"
-
-        mock_validate.return_value = {"is_valid": True, "is_playlist": True}
-        mock_config = {"url": self.playlist_url, "output_format": "mp3"}
-        mock_create_config.return_value = mock_config
-        
-        mock_download_playlist.return_value = [
-            {"success": True, "title": "Audio 1"},
-            {"success": False, "title": "Audio 2"}
-        ]
+        mock_args = make_args(url=PLAYLIST_URL, format="mp4", resolution="720p")
+        mock_playlist = SimpleNamespace(title="My Test Playlist")
+        monkeypatch.setattr(
+            "app.tools.media_downloader.youtube_downloader.validate_youtube_url",
+            lambda url: {"is_valid": True, "is_playlist": True},
+        )
+        monkeypatch.setattr("app.tools.media_downloader.youtube_downloader.create_playlist_instance", lambda url: mock_playlist)
+        monkeypatch.setattr("app.tools.media_downloader.ensure_directory_exists", lambda path: path)
+
+        config = create_playlist_config(mock_args, "video")
+
+        assert config["url"] == PLAYLIST_URL
+        assert config["output_format"] == "mp4"
+        assert config["resolution"] == "720p"
+        assert "My Test Playlist" in config["output_path"]
+        assert config["playlist"] is mock_playlist
+
+    @pytest.mark.parametrize("media_type, output_format, route, download_target", [
+        ("video", "mp4", route_video_download, "download_playlist_videos"),
+        ("audio", "mp3", route_audio_download, "download_playlist_audios"),
+    ], ids=["video", "audio"])
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_route_download_playlist(self, monkeypatch, make_args, media_type, output_format, route, download_target):
+        """Test routing downloads for playlist URLs"""
+        mock_args = make_args(url=PLAYLIST_URL, format=output_format)
+        mock_config = {"url": PLAYLIST_URL, "output_format": output_format}
+        mock_validate = MagicMock(return_value={"is_valid": True, "is_playlist": True})
+        mock_create_config = MagicMock(return_value=mock_config)
+        mock_download_playlist = AsyncMock(return_value=[
+            {"success": True, "title": "Item 1"},
+            {"success": False, "title": "Item 2"}
+        ])
+        monkeypatch.setattr("app.tools.media_downloader.youtube_downloader.validate_youtube_url", mock_validate)
+        monkeypatch.setattr("app.tools.media_downloader.create_playlist_config", mock_create_config)
+        monkeypatch.setattr(f"app.tools.media_downloader.{download_target}", mock_download_playlist)
 
-        result = await route_audio_download(mock_args)
+        result = await route(mock_args)
 
         assert len(result) == 2
-        mock_validate.assert_called_once_with(self.playlist_url)
-        mock_create_config.assert_called_once_with(mock_args, "audio")
+        mock_validate.assert_called_once_with(PLAYLIST_URL)
+        mock_create_config.assert_called_once_with(mock_args, media_type)
         mock_download_playlist.assert_called_once_with(mock_config)
 
-    @patch('app.tools.youtube_downloader.Playlist')
-    @pytest.mark.asyncio
-    async def test_playlist_error_handling(self, mock_playlist_class):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_playlist_error_handling(self, monkeypatch, playlist_class):
         """Test playlist error handling for individual video failures"""
         # Setup playlist mock
         mock_playlist = MagicMock()
@@ -347,65 +360,68 @@ class TestPlaylistDownloader:
         mock_video.title = "Problematic Video"
         mock_video.watch_url = "https://youtube.com/watch?v=problem"
         mock_playlist.videos = [mock_video]
-        mock_playlist_class.return_value = mock_playlist
-
-        with patch('app.tools.youtube_downloader.download_single_video') as mock_download:
-            from unittest.mock import AsyncMock
-            mock_download.side_effect = AsyncMock(side_effect=Exception("Network error"))
-            
-            result = await yt_download_playlist_videos(
-                self.playlist_url,
-                "/downloads",
-                "720p"
-            )
-
-            assert len(result) == 1
-            assert result[0]["success"] is False
-            assert "Network error" in result[0]["metadata"]["error"]
-
-    @pytest.mark.asyncio
-    async def test_empty_playlist_handling(self):
+        playlist_class.return_value = mock_playlist
+        monkeypatch.setattr(
+            "app.tools.youtube_downloader.download_single_video",
+            AsyncMock(side_effect=Exception("Network error")),
+        )
+
+        result = await yt_download_playlist_videos(
+            PLAYLIST_URL,
+            "/downloads",
+            "720p"
+        )
+
+        assert len(result) == 1
+        assert result[0]["success"] is False
+        assert "Network error" in result[0]["metadata"]["error"]
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_empty_playlist_handling(self, playlist_class):
         """Test handling of empty playlists"""
-        with patch('app.tools.youtube_downloader.Playlist') as mock_playlist_class:
-            mock_playlist = MagicMock()
-            mock_playlist.title = "Empty Playlist"
-            mock_playlist.videos = []  # Empty playlist
-            mock_playlist_class.return_value = mock_playlist
-
-            result = await yt_download_playlist_videos(
-                self.playlist_url,
-                "/downloads",
-                "720p"
-            )
-
-            assert result == []
-
-    @patch('builtins.print')
-    @pytest.mark.asyncio
-    async def test_playlist_download_progress_output(self, mock_print):
+        mock_playlist = MagicMock()
+        mock_playlist.title = "Empty Playlist"
+        mock_playlist.videos = []  # Empty playlist
+        playlist_class.return_value = mock_playlist
+
+        result = await yt_download_playlist_videos(
+            PLAYLIST_URL,
+            "/downloads",
+            "720p"
+        )
+
+        assert result == []
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_playlist_download_progress_output(self, capsys, monkeypatch, playlist_class):
         """Test that playlist downloads show progress information"""
-        with patch('app.tools.youtube_downloader.Playlist') as mock_playlist_class, \
-             patch('app.tools.youtube_downloader.download_single_video') as mock_download:
-            
-            mock_playlist = MagicMock()
-            mock_playlist.title = "Test Playlist"
-            
-            mock_video1 = MagicMock()
-            mock_video1.title = "Video 1"
-            mock_video1.watch_url = "https://youtube.com/watch?v=video1"
-            mock_playlist.videos = [mock_video1]
-            mock_playlist_class.return_value = mock_playlist
-
-            from unittest.mock import AsyncMock
-            mock_download.side_effect = AsyncMock(return_value={
+        mock_playlist = MagicMock()
+        mock_playlist.title = "Test Playlist"
+        
+        mock_video1 = MagicMock()
+        mock_video1.title = "Video 1"
+        mock_video1.watch_url = "https://youtube.com/watch?v=video1"
+        mock_playlist.videos = [mock_video1]
+        playlist_class.return_value = mock_playlist
+
+        async def fake_download(*args, on_start=None, **kwargs):
+            # The worker announces the item once the video is resolved
+            on_start(mock_video1)
+            return {
                 "success": True,
                 "file_path": "/downloads/video1.mp4",
                 "metadata": {"title": "Video 1"}
-            })
-
-            await yt_download_playlist_videos(self.playlist_url, "/downloads", "720p")
-
-            # Check that progress was printed
-            print_calls = [call[0][0] for call in mock_print.call_args_list]
-            assert any("[1/1] Downloading: Video 1" in call for call in print_calls)
-            assert any("Successfully downloaded Video 1" in call for call in print_calls)
\ No newline at end of file
+            }
+        mock_download = AsyncMock(side_effect=fake_download)
+        monkeypatch.setattr("app.tools.youtube_downloader.download_single_video", mock_download)
+
+        await yt_download_playlist_videos(PLAYLIST_URL, "/downloads", "720p")
+
+        # Check that progress was printed
+        output = capsys.readouterr().out
+        assert "[1/1] Downloading: Video 1" in output
+        assert "Successfully downloaded Video 1" in output
+        # Per-chunk progress bars are off for playlist items
+        assert mock_download.call_args[0][3] is None
+        # Items run on the playlist's own pool, not the default executor
+        assert isinstance(mock_download.call_args.kwargs["executor"], ThreadPoolExecutor)